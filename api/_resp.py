@@ -0,0 +1,21 @@
+import orjson
+from flask import Response
+
+# Body for constant-shape status payloads; only the message varies
+_STATUS_BODY = b'{"status":"%s","message":%s}'
+
+def _status_response(status: bytes, msg: str, code: int) -> Response:
+    """Build a JSON status response without going through jsonify."""
+    return Response(_STATUS_BODY % (status, orjson.dumps(msg)), status=code, mimetype='application/json')
+
+def _ok(msg: str) -> Response:
+    """Return a success response with a message."""
+    return _status_response(b'success', msg, 200)
+
+def _warn(msg: str) -> Response:
+    """Return a warning response with a message."""
+    return _status_response(b'warning', msg, 200)
+
+def _err(msg: str, code: int = 500) -> Response:
+    """Return an error response with a message and HTTP status code."""
+    return _status_response(b'error', msg, code)
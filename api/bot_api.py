@@ -1,6 +1,7 @@
-import os
+import logging
 from flask import request, jsonify
-from app import app, traffic_bot
+from api._resp import _ok, _warn, _err
+from app import app, traffic_bot, DEFAULT_WORKERS, MAX_WORKERS
 
 # Get loggers
 activity_logger = logging.getLogger("activity")
@@ -10,37 +11,30 @@ error_logger = logging.getLogger("error")
 def start_bot():
     """Start the traffic bot."""
     try:
-        data = request.json or {}
-        num_workers = int(data.get('workers', os.getenv('DEFAULT_WORKERS', 8)))
-        max_workers = int(os.getenv('MAX_WORKERS', 12))
+        data = request.get_json(silent=True, cache=True) or {}
+        num_workers = int(data.get('workers', DEFAULT_WORKERS))
         
         # Cap workers at the maximum allowed
-        if num_workers > max_workers:
-            num_workers = max_workers
+        if num_workers > MAX_WORKERS:
+            num_workers = MAX_WORKERS
         
         # Load keywords and URLs if provided
         if 'keywords' in data:
-            traffic_bot.keywords = data['keywords']
-            activity_logger.info(f"Loaded {len(traffic_bot.keywords)} keywords from request")
+            keyword_count = traffic_bot.set_keywords(data['keywords'])
+            activity_logger.info("Loaded %d keywords from request", keyword_count)
         
         if 'urls' in data:
-            traffic_bot.urls = data['urls']
-            activity_logger.info(f"Loaded {len(traffic_bot.urls)} URLs from request")
+            url_count = traffic_bot.set_urls(data['urls'])
+            activity_logger.info("Loaded %d URLs from request", url_count)
         
         # Start bot if not already running
         if not traffic_bot.running:
             traffic_bot.start(num_workers)
-            return jsonify({
-                "status": "success", 
-                "message": f"Started bot with {num_workers} workers"
-            })
+            return _ok(f"Started bot with {num_workers} workers")
         else:
-            return jsonify({
-                "status": "warning", 
-                "message": "Bot is already running"
-            })
+            return _warn("Bot is already running")
     except Exception as e:
-        error_logger.error(f"Error starting bot: {str(e)}")
+        error_logger.error("Error starting bot: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/stop', methods=['POST'])
@@ -49,17 +43,11 @@ def stop_bot():
     try:
         if traffic_bot.running:
             traffic_bot.stop()
-            return jsonify({
-                "status": "success", 
-                "message": "Stopped bot"
-            })
+            return _ok("Stopped bot")
         else:
-            return jsonify({
-                "status": "warning", 
-                "message": "Bot is not running"
-            })
+            return _warn("Bot is not running")
     except Exception as e:
-        error_logger.error(f"Error stopping bot: {str(e)}")
+        error_logger.error("Error stopping bot: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/pause', methods=['POST'])
@@ -68,17 +56,11 @@ def pause_bot():
     try:
         if traffic_bot.running and not traffic_bot.paused:
             traffic_bot.pause()
-            return jsonify({
-                "status": "success", 
-                "message": "Paused bot"
-            })
+            return _ok("Paused bot")
         else:
-            return jsonify({
-                "status": "warning", 
-                "message": "Bot is not running or already paused"
-            })
+            return _warn("Bot is not running or already paused")
     except Exception as e:
-        error_logger.error(f"Error pausing bot: {str(e)}")
+        error_logger.error("Error pausing bot: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/resume', methods=['POST'])
@@ -87,17 +69,11 @@ def resume_bot():
     try:
         if traffic_bot.running and traffic_bot.paused:
             traffic_bot.resume()
-            return jsonify({
-                "status": "success", 
-                "message": "Resumed bot"
-            })
+            return _ok("Resumed bot")
         else:
-            return jsonify({
-                "status": "warning", 
-                "message": "Bot is not running or not paused"
-            })
+            return _warn("Bot is not running or not paused")
     except Exception as e:
-        error_logger.error(f"Error resuming bot: {str(e)}")
+        error_logger.error("Error resuming bot: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/stats', methods=['GET'])
@@ -110,99 +86,78 @@ def get_bot_stats():
             "stats": stats
         })
     except Exception as e:
-        error_logger.error(f"Error getting bot stats: {str(e)}")
+        error_logger.error("Error getting bot stats: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/keywords', methods=['POST'])
 def update_keywords():
     """Update the bot's keywords."""
     try:
-        data = request.json
-        if not data or 'keywords' not in data:
-            return jsonify({
-                "status": "error", 
-                "message": "No keywords provided"
-            }), 400
+        data = request.get_json(silent=True, cache=True) or {}
+        if 'keywords' not in data:
+            return _err("No keywords provided", 400)
         
-        traffic_bot.keywords = data['keywords']
+        keyword_count = traffic_bot.set_keywords(data['keywords'])
         
-        return jsonify({
-            "status": "success",
-            "message": f"Updated with {len(traffic_bot.keywords)} keywords"
-        })
+        return _ok(f"Updated with {keyword_count} keywords")
     except Exception as e:
-        error_logger.error(f"Error updating keywords: {str(e)}")
+        error_logger.error("Error updating keywords: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/urls', methods=['POST'])
 def update_urls():
     """Update the bot's URLs."""
     try:
-        data = request.json
-        if not data or 'urls' not in data:
-            return jsonify({
-                "status": "error", 
-                "message": "No URLs provided"
-            }), 400
+        data = request.get_json(silent=True, cache=True) or {}
+        if 'urls' not in data:
+            return _err("No URLs provided", 400)
         
-        traffic_bot.urls = data['urls']
+        url_count = traffic_bot.set_urls(data['urls'])
         
-        return jsonify({
-            "status": "success",
-            "message": f"Updated with {len(traffic_bot.urls)} URLs"
-        })
+        return _ok(f"Updated with {url_count} URLs")
     except Exception as e:
-        error_logger.error(f"Error updating URLs: {str(e)}")
+        error_logger.error("Error updating URLs: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/tracking', methods=['GET'])
 def get_tracking_urls():
     """Get custom tracking URLs."""
     try:
+        # Read the reference once; writers swap in a new dict
+        tracking_urls = traffic_bot.custom_tracking_urls
         return jsonify({
             "status": "success",
-            "tracking_urls": traffic_bot.custom_tracking_urls
+            "tracking_urls": tracking_urls
         })
     except Exception as e:
-        error_logger.error(f"Error getting tracking URLs: {str(e)}")
+        error_logger.error("Error getting tracking URLs: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/tracking', methods=['POST'])
 def add_tracking_url():
     """Add a custom tracking URL."""
     try:
-        data = request.json
-        if not data or 'original_url' not in data or 'tracking_url' not in data:
-            return jsonify({
-                "status": "error", 
-                "message": "Original URL and tracking URL are required"
-            }), 400
+        data = request.get_json(silent=True, cache=True) or {}
+        original_url = data.get('original_url')
+        tracking_url = data.get('tracking_url')
+        if not (original_url and tracking_url):
+            return _err("Original URL and tracking URL are required", 400)
         
-        traffic_bot.add_tracking_url(data['original_url'], data['tracking_url'])
+        traffic_bot.add_tracking_url(original_url, tracking_url)
         
-        return jsonify({
-            "status": "success",
-            "message": f"Added tracking URL for {data['original_url']}"
-        })
+        return _ok(f"Added tracking URL for {original_url}")
     except Exception as e:
-        error_logger.error(f"Error adding tracking URL: {str(e)}")
+        error_logger.error("Error adding tracking URL: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/bot/tracking/<path:original_url>', methods=['DELETE'])
 def remove_tracking_url(original_url):
     """Remove a custom tracking URL."""
     try:
-        if original_url in traffic_bot.custom_tracking_urls:
-            del traffic_bot.custom_tracking_urls[original_url]
-            return jsonify({
-                "status": "success",
-                "message": f"Removed tracking URL for {original_url}"
-            })
+        if traffic_bot.remove_tracking_url(original_url):
+            return _ok(f"Removed tracking URL for {original_url}")
         else:
-            return jsonify({
-                "status": "warning",
-                "message": f"No tracking URL found for {original_url}"
-            })
+            return _warn(f"No tracking URL found for {original_url}")
     except Exception as e:
-        error_logger.error(f"Error removing tracking URL: {str(e)}")
+        error_logger.error("Error removing tracking URL: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
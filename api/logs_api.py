@@ -1,70 +1,117 @@
 import os
-from flask import request, jsonify
-from app import app
+import logging
+import orjson
+from flask import Response, request, jsonify, send_file
+from api._resp import _ok
+from app import app, activity_handler, error_handler, ACTIVITY_LOG_PATH, ERROR_LOG_PATH
 
 # Get loggers
 activity_logger = logging.getLogger("activity")
 error_logger = logging.getLogger("error")
 
+def tail(path: str, n: int, chunk_size: int = 65536) -> list:
+    """Return the last n lines of a file, reading backwards from the end.
+    
+    Only the chunks needed to cover the requested lines are read, so the
+    cost does not grow with the size of the log file.
+    """
+    if n <= 0:
+        return []
+    
+    chunks = []
+    newlines = 0
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        # One extra newline guarantees the first returned line is complete
+        while pos > 0 and newlines <= n:
+            read_len = min(chunk_size, pos)
+            pos -= read_len
+            f.seek(pos)
+            chunk = f.read(read_len)
+            newlines += chunk.count(b'\n')
+            chunks.append(chunk)
+    
+    buf = b''.join(reversed(chunks))
+    return [line.decode('utf-8', errors='replace') for line in buf.splitlines(keepends=True)[-n:]]
+
+def stream_logs(logs: list):
+    """Yield a success payload for the given log lines one line at a time."""
+    yield b'{"status":"success","logs":['
+    for i, line in enumerate(logs):
+        if i:
+            yield b','
+        yield orjson.dumps(line)
+    yield b']}'
+
+def send_log(path: str) -> Response:
+    """Send a whole log file as plain text.
+    
+    The file is handed to the WSGI server's file wrapper, which can use
+    sendfile(2) instead of copying the log through Python.
+    """
+    # send_file resolves relative paths against the app root, the log
+    # handlers against the working directory
+    return send_file(os.path.abspath(path), mimetype='text/plain', conditional=True)
+
+def truncate_log(path: str, handler: logging.Handler) -> None:
+    """Empty a log file in place, flushing its handler first."""
+    # Flush first so buffered records don't reappear after truncation
+    handler.flush()
+    try:
+        os.truncate(path, 0)
+    except FileNotFoundError:
+        pass
+
 @app.route('/api/logs/activity', methods=['GET'])
 def get_activity_logs():
     """Get activity logs."""
     try:
-        lines = request.args.get('lines', 100, type=int)
+        # Full downloads skip the in-process tail
+        if 'download' in request.args:
+            return send_log(ACTIVITY_LOG_PATH)
         
-        with open(os.getenv('ACTIVITY_LOG', 'logs/bot_activity.log'), 'r') as f:
-            logs = f.readlines()
+        lines = request.args.get('lines', 100, type=int)
         
         # Get the most recent lines
-        logs = logs[-lines:] if len(logs) > lines else logs
+        logs = tail(ACTIVITY_LOG_PATH, lines)
         
-        return jsonify({
-            "status": "success",
-            "logs": logs
-        })
+        return Response(stream_logs(logs), mimetype='application/json')
     except Exception as e:
-        error_logger.error(f"Error getting activity logs: {str(e)}")
+        error_logger.error("Error getting activity logs: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/logs/error', methods=['GET'])
 def get_error_logs():
     """Get error logs."""
     try:
-        lines = request.args.get('lines', 100, type=int)
+        # Full downloads skip the in-process tail
+        if 'download' in request.args:
+            return send_log(ERROR_LOG_PATH)
         
-        with open(os.getenv('ERROR_LOG', 'logs/bot_errors.log'), 'r') as f:
-            logs = f.readlines()
+        lines = request.args.get('lines', 100, type=int)
         
         # Get the most recent lines
-        logs = logs[-lines:] if len(logs) > lines else logs
+        logs = tail(ERROR_LOG_PATH, lines)
         
-        return jsonify({
-            "status": "success",
-            "logs": logs
-        })
+        return Response(stream_logs(logs), mimetype='application/json')
     except Exception as e:
-        error_logger.error(f"Error getting error logs: {str(e)}")
+        error_logger.error("Error getting error logs: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/logs/clear', methods=['POST'])
 def clear_logs():
     """Clear log files."""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True, cache=True) or {}
         log_type = data.get('type', 'all')
         
-        if log_type in ['activity', 'all']:
-            with open(os.getenv('ACTIVITY_LOG', 'logs/bot_activity.log'), 'w') as f:
-                f.write('')
+        if log_type in ('activity', 'all'):
+            truncate_log(ACTIVITY_LOG_PATH, activity_handler)
         
-        if log_type in ['error', 'all']:
-            with open(os.getenv('ERROR_LOG', 'logs/bot_errors.log'), 'w') as f:
-                f.write('')
+        if log_type in ('error', 'all'):
+            truncate_log(ERROR_LOG_PATH, error_handler)
         
-        return jsonify({
-            "status": "success",
-            "message": f"Cleared {log_type} logs"
-        })
+        return _ok(f"Cleared {log_type} logs")
     except Exception as e:
-        error_logger.error(f"Error clearing logs: {str(e)}")
+        error_logger.error("Error clearing logs: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
@@ -1,12 +1,25 @@
+import re
 import time
 import os
+import logging
 from flask import request, jsonify
+from api._resp import _ok, _err
 from app import app, vpn_manager
+from modules.vpn_manager import VPNManager
 
 # Get loggers
 activity_logger = logging.getLogger("activity")
 error_logger = logging.getLogger("error")
 
+# Supported VPN provider names
+_PROVIDERS = VPNManager.VPN_PROVIDER_NAMES
+
+# Modification time and size of proxies.txt at the last reload
+_PROXY_FILE_CACHE = {'signature': None}
+
+# Matches the credentials part of a proxy URL, with or without a scheme
+_MASK_RE = re.compile(r'^([a-z][a-z0-9+.-]*://)?[^@]+@', re.IGNORECASE)
+
 @app.route('/api/vpn/ip', methods=['GET'])
 def get_current_ip():
     """Get the current public IP address."""
@@ -17,18 +30,15 @@ def get_current_ip():
             "ip": ip
         })
     except Exception as e:
-        error_logger.error(f"Error getting current IP: {str(e)}")
+        error_logger.error("Error getting current IP: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/vpn/regions/<provider>', methods=['GET'])
 def get_vpn_regions(provider):
     """Get regions for a specific VPN provider."""
     try:
-        if provider not in vpn_manager.vpn_providers:
-            return jsonify({
-                "status": "error", 
-                "message": f"Unknown VPN provider: {provider}"
-            }), 400
+        if provider not in _PROVIDERS:
+            return _err(f"Unknown VPN provider: {provider}", 400)
         
         # Load regions if needed
         if not vpn_manager.vpn_providers[provider]['regions']:
@@ -42,80 +52,56 @@ def get_vpn_regions(provider):
             "regions": regions
         })
     except Exception as e:
-        error_logger.error(f"Error getting VPN regions: {str(e)}")
+        error_logger.error("Error getting VPN regions: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/vpn/enable/<provider>', methods=['POST'])
 def enable_vpn_provider(provider):
     """Enable a VPN provider."""
     try:
-        if provider not in vpn_manager.vpn_providers:
-            return jsonify({
-                "status": "error", 
-                "message": f"Unknown VPN provider: {provider}"
-            }), 400
+        if provider not in _PROVIDERS:
+            return _err(f"Unknown VPN provider: {provider}", 400)
         
         success = vpn_manager.enable_vpn(provider)
         
         if success:
-            return jsonify({
-                "status": "success",
-                "message": f"Enabled VPN provider: {provider}"
-            })
+            return _ok(f"Enabled VPN provider: {provider}")
         else:
-            return jsonify({
-                "status": "error",
-                "message": f"Failed to enable VPN provider: {provider}"
-            }), 500
+            return _err(f"Failed to enable VPN provider: {provider}", 500)
     except Exception as e:
-        error_logger.error(f"Error enabling VPN provider: {str(e)}")
+        error_logger.error("Error enabling VPN provider: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/vpn/disable/<provider>', methods=['POST'])
 def disable_vpn_provider(provider):
     """Disable a VPN provider."""
     try:
-        if provider not in vpn_manager.vpn_providers:
-            return jsonify({
-                "status": "error", 
-                "message": f"Unknown VPN provider: {provider}"
-            }), 400
+        if provider not in _PROVIDERS:
+            return _err(f"Unknown VPN provider: {provider}", 400)
         
         success = vpn_manager.disable_vpn(provider)
         
         if success:
-            return jsonify({
-                "status": "success",
-                "message": f"Disabled VPN provider: {provider}"
-            })
+            return _ok(f"Disabled VPN provider: {provider}")
         else:
-            return jsonify({
-                "status": "error",
-                "message": f"Failed to disable VPN provider: {provider}"
-            }), 500
+            return _err(f"Failed to disable VPN provider: {provider}", 500)
     except Exception as e:
-        error_logger.error(f"Error disabling VPN provider: {str(e)}")
+        error_logger.error("Error disabling VPN provider: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/vpn/connect', methods=['POST'])
 def connect_vpn():
     """Connect to a VPN provider and region."""
     try:
-        data = request.json
-        if not data or 'provider' not in data or 'region' not in data:
-            return jsonify({
-                "status": "error", 
-                "message": "Provider and region must be specified"
-            }), 400
+        data = request.get_json(silent=True, cache=True) or {}
+        if 'provider' not in data or 'region' not in data:
+            return _err("Provider and region must be specified", 400)
         
         provider = data['provider']
         region = data['region']
         
-        if provider not in vpn_manager.vpn_providers:
-            return jsonify({
-                "status": "error", 
-                "message": f"Unknown VPN provider: {provider}"
-            }), 400
+        if provider not in _PROVIDERS:
+            return _err(f"Unknown VPN provider: {provider}", 400)
         
         success = vpn_manager.connect_vpn(provider, region)
         
@@ -126,12 +112,9 @@ def connect_vpn():
                 "ip": vpn_manager.get_current_ip()
             })
         else:
-            return jsonify({
-                "status": "error",
-                "message": f"Failed to connect to {provider} region: {region}"
-            }), 500
+            return _err(f"Failed to connect to {provider} region: {region}", 500)
     except Exception as e:
-        error_logger.error(f"Error connecting to VPN: {str(e)}")
+        error_logger.error("Error connecting to VPN: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/vpn/disconnect', methods=['POST'])
@@ -147,12 +130,9 @@ def disconnect_vpn():
                 "ip": vpn_manager.get_current_ip()
             })
         else:
-            return jsonify({
-                "status": "error",
-                "message": "Failed to disconnect from VPNs"
-            }), 500
+            return _err("Failed to disconnect from VPNs", 500)
     except Exception as e:
-        error_logger.error(f"Error disconnecting from VPN: {str(e)}")
+        error_logger.error("Error disconnecting from VPN: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/proxies', methods=['GET'])
@@ -164,15 +144,7 @@ def get_proxies():
         proxy_sample = vpn_manager.proxies[:5] if proxy_count > 0 else []
         
         # Mask usernames and passwords in the sample
-        masked_proxies = []
-        for proxy in proxy_sample:
-            if '@' in proxy:
-                # Mask auth credentials
-                parts = proxy.split('@')
-                masked = 'http://***:***@' + parts[1]
-                masked_proxies.append(masked)
-            else:
-                masked_proxies.append(proxy)
+        masked_proxies = [_MASK_RE.sub(r'\1***:***@', proxy) for proxy in proxy_sample]
         
         return jsonify({
             "status": "success",
@@ -182,50 +154,52 @@ def get_proxies():
             "use_proxies": vpn_manager.use_proxies
         })
     except Exception as e:
-        error_logger.error(f"Error getting proxies: {str(e)}")
+        error_logger.error("Error getting proxies: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/proxies/reload', methods=['POST'])
 def reload_proxies():
     """Reload proxies from the proxies.txt file."""
     try:
-        if os.path.exists('proxies.txt'):
-            vpn_manager.load_proxies('proxies.txt')
-            return jsonify({
-                "status": "success",
-                "message": f"Reloaded {len(vpn_manager.proxies)} proxies from proxies.txt"
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": "proxies.txt file not found"
-            }), 404
+        try:
+            st = os.stat('proxies.txt')
+        except FileNotFoundError:
+            return _err("proxies.txt file not found", 404)
+        
+        # Skip re-parsing when the file hasn't changed since the last reload
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == _PROXY_FILE_CACHE['signature']:
+            return _ok(f"proxies.txt unchanged, {len(vpn_manager.proxies)} proxies loaded")
+        
+        # Only remember the file once it loads, so a failed load is retried
+        if not vpn_manager.load_proxies('proxies.txt'):
+            return _err("Failed to load proxies.txt", 500)
+        _PROXY_FILE_CACHE['signature'] = signature
+        proxy_count = len(vpn_manager.proxies)
+        return _ok(f"Reloaded {proxy_count} proxies from proxies.txt")
     except Exception as e:
-        error_logger.error(f"Error reloading proxies: {str(e)}")
+        error_logger.error("Error reloading proxies: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/proxies/test', methods=['POST'])
 def test_proxy():
     """Test a specific proxy or get a random one and test it."""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True, cache=True) or {}
         proxy = data.get('proxy')
         
         if not proxy:
             # Get a random proxy
             proxy = vpn_manager.get_random_proxy()
             if not proxy:
-                return jsonify({
-                    "status": "error",
-                    "message": "No proxies available to test"
-                }), 400
+                return _err("No proxies available to test", 400)
         
         # Set the proxy as current
         vpn_manager.current_proxy = proxy
         
         # Test proxy by checking IP
         start_time = time.time()
-        ip = vpn_manager.get_current_ip()
+        ip = vpn_manager.get_current_ip(use_cache=False)
         response_time = time.time() - start_time
         
         return jsonify({
@@ -235,14 +209,14 @@ def test_proxy():
             "response_time": round(response_time, 2)
         })
     except Exception as e:
-        error_logger.error(f"Error testing proxy: {str(e)}")
+        error_logger.error("Error testing proxy: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/proxies/toggle', methods=['POST'])
 def toggle_proxies():
     """Toggle proxy usage."""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True, cache=True) or {}
         use_proxies = data.get('use_proxies')
         
         if use_proxies is not None:
@@ -253,10 +227,7 @@ def toggle_proxies():
                 "use_proxies": vpn_manager.use_proxies
             })
         else:
-            return jsonify({
-                "status": "error",
-                "message": "use_proxies parameter required"
-            }), 400
+            return _err("use_proxies parameter required", 400)
     except Exception as e:
-        error_logger.error(f"Error toggling proxies: {str(e)}")
+        error_logger.error("Error toggling proxies: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
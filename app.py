@@ -1,30 +1,52 @@
 import os
 import logging
+import orjson
 from flask import Flask, render_template
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Settings read once at startup
+DEFAULT_WORKERS = int(os.getenv('DEFAULT_WORKERS', 8))
+MAX_WORKERS = int(os.getenv('MAX_WORKERS', 12))
+ACTIVITY_LOG_PATH = os.getenv('ACTIVITY_LOG', 'logs/bot_activity.log')
+ERROR_LOG_PATH = os.getenv('ERROR_LOG', 'logs/bot_errors.log')
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 activity_logger = logging.getLogger("activity")
 error_logger = logging.getLogger("error")
 
 # Configure file handlers
-os.makedirs("logs", exist_ok=True)
-activity_handler = logging.FileHandler("logs/bot_activity.log")
+for log_path in (ACTIVITY_LOG_PATH, ERROR_LOG_PATH):
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+activity_handler = logging.FileHandler(ACTIVITY_LOG_PATH)
 activity_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 activity_logger.addHandler(activity_handler)
 activity_logger.propagate = False
 
-error_handler = logging.FileHandler("logs/bot_errors.log")
+error_handler = logging.FileHandler(ERROR_LOG_PATH)
 error_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 error_logger.addHandler(error_handler)
 error_logger.propagate = False
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes API responses with orjson."""
+    # orjson never sorts or indents unless asked to, so keep jsonify compact
+    sort_keys = False
+    compact = True
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Import components (after Flask app is created)
 from modules.vpn_manager import VPNManager
@@ -50,17 +72,56 @@ def index():
     """Render the main web interface."""
     return render_template('index.html')
 
-if __name__ == "__main__":
+def load_startup_data() -> None:
+    """Load proxies and VPN regions before serving requests."""
     # Load proxies if the file exists
     if os.path.exists("proxies.txt"):
         vpn_manager.load_proxies("proxies.txt")
     
-    # Load VPN regions
-    vpn_manager.load_vpn_regions('pia')
-    vpn_manager.load_vpn_regions('nordvpn')
-    vpn_manager.load_vpn_regions('expressvpn')
+    # Load VPN regions, overlapping the three CLI calls
+    vpn_manager.load_all_regions()
+
+def run_production_server(host: str, port: int) -> None:
+    """Serve the app with gunicorn's threaded worker.
+    
+    Equivalent to: gunicorn -w 1 -k gthread --threads 8 --keep-alive 30 app:app
+    """
+    from gunicorn.app.base import BaseApplication
+    from app import app as routed_app
     
-    # Start the web application
+    # The bot, its workers and its stats live in this process, so a single
+    # worker process serves the API with threads for concurrent polling
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": 1,
+        "worker_class": "gthread",
+        "threads": 8,
+        "keepalive": 30
+    }
+    
+    class GunicornApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return routed_app
+    
+    GunicornApplication().run()
+
+# WSGI servers import this module as "app" rather than running it. Running
+# app.py directly also re-imports it as "app" through the API modules, and
+# that copy is the one the API routes are registered on.
+if __name__ != "__main__":
+    load_startup_data()
+
+if __name__ == "__main__":
     host = os.getenv("SERVER_HOST", "0.0.0.0")
     port = int(os.getenv("SERVER_PORT", 5000))
-    app.run(host=host, port=port)
\ No newline at end of file
+    
+    if os.getenv("FLASK_ENV") == "development":
+        # Serve the imported "app" module's Flask app, which has the API routes
+        from app import app as routed_app
+        routed_app.run(host=host, port=port)
+    else:
+        run_production_server(host, port)
\ No newline at end of file
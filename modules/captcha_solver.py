@@ -1,7 +1,14 @@
+import asyncio
+import hashlib
 import logging
 import re
-from typing import Optional
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
 from anticaptchaofficial.recaptchav2proxyless import recaptchaV2Proxyless
 from anticaptchaofficial.recaptchav3proxyless import recaptchaV3Proxyless
 from anticaptchaofficial.imagecaptcha import imagecaptcha
@@ -10,17 +17,135 @@ from anticaptchaofficial.imagecaptcha import imagecaptcha
 activity_logger = logging.getLogger("activity")
 error_logger = logging.getLogger("error")
 
+# reCAPTCHA site key attribute, matched against the ASCII bytes of the page
+_SITEKEY_RE = re.compile(rb'data-sitekey="([^"]+)"')
+
+# Collects every CAPTCHA signal in a single browser round trip. Most pages
+# have no CAPTCHA, so the cheap selector probe runs first and the page text
+# is only scanned when it misses. textContent avoids the layout pass that
+# innerText would force.
+_DETECT_CAPTCHA_JS = """
+const siteKeyElement = document.querySelector('[data-sitekey]');
+const hasRecaptcha = !!(siteKeyElement ||
+    document.querySelector("iframe[src*='recaptcha'], .g-recaptcha"));
+const unusual = !hasRecaptcha && !!document.body &&
+    /unusual traffic|suspicious activity/i.test(document.body.textContent);
+if (!hasRecaptcha && !unusual) {
+    return null;
+}
+return {
+    url: location.href,
+    sitekey: siteKeyElement && siteKeyElement.getAttribute('data-sitekey'),
+    hasRecaptcha: hasRecaptcha,
+    unusual: unusual
+};
+"""
+
+# Picks the form to submit after solving, in order of preference. A selector
+# list would return matches in document order, so the fallbacks are chained
+_FIND_CAPTCHA_FORM_JS = """
+return document.querySelector('form:has(div.g-recaptcha)') ||
+    document.querySelector('form#captcha-form') ||
+    document.querySelector('form');
+"""
+
+# Buttons that dismiss "unusual traffic" interstitials
+_CONTINUE_XPATH = "//button[contains(., 'Continue') or contains(., 'Verify') or contains(., 'I am human')]"
+
+# Writes a solved token into the reCAPTCHA response textarea
+_INJECT_TOKEN_JS = """
+const response = document.getElementById('g-recaptcha-response');
+response.innerHTML = arguments[0];
+response.value = arguments[0];
+"""
+
+# How long an image CAPTCHA answer is reused for identical image bytes
+_IMAGE_TTL = 600
+
+# Google starts rejecting v2 solves submitted more often than about once a minute
+_V2_MIN_INTERVAL = 60
+
+class RateLimited(Exception):
+    """Raised when a solve would exceed the configured submission rate."""
+
 class CaptchaSolver:
     """Class for solving various types of CAPTCHAs using AntiCaptcha service."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_requests_per_hour: int = 60, max_concurrent: int = 4):
         """Initialize with AntiCaptcha API key.
         
         Args:
             api_key: AntiCaptcha API key
+            max_requests_per_hour: Maximum number of solves submitted per hour
+            max_concurrent: Maximum number of solves awaited at the same time
         """
         self.api_key = api_key
         self.verbose = False  # Set to True for detailed logs from AntiCaptcha
+        
+        # Threads that run blocking solves for the async methods
+        self.max_concurrent = max_concurrent
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="captcha")
+        
+        # Token bucket limiting solve submissions
+        self.max_requests_per_hour = max_requests_per_hour
+        self._tokens = float(max_requests_per_hour)
+        self._last_refill = time.monotonic()
+        self._last_v2_solve = float("-inf")
+        self._bucket_lock = threading.Lock()
+        
+        # AntiCaptcha clients keep per-task state, so each thread reuses its own
+        self._local = threading.local()
+        
+        # Image CAPTCHA answers keyed by a digest of the image bytes
+        self._img_cache: Dict[bytes, Tuple[str, float]] = {}
+    
+    def _cache_image_answer(self, digest: bytes, answer: str) -> None:
+        """Cache an image CAPTCHA answer, dropping any that have expired."""
+        now = time.monotonic()
+        self._img_cache = {
+            cached_digest: cached for cached_digest, cached in self._img_cache.items()
+            if now - cached[1] < _IMAGE_TTL
+        }
+        self._img_cache[digest] = (answer, now)
+    
+    def _acquire(self, min_interval: float = 0.0) -> None:
+        """Take one submission token from the bucket.
+        
+        Args:
+            min_interval: Minimum seconds since the previous reCAPTCHA v2 solve
+            
+        Raises:
+            RateLimited: If no token is available or min_interval hasn't passed
+        """
+        with self._bucket_lock:
+            now = time.monotonic()
+            
+            # Refill continuously up to one hour's worth of tokens
+            refill = (now - self._last_refill) * self.max_requests_per_hour / 3600
+            self._tokens = min(float(self.max_requests_per_hour), self._tokens + refill)
+            self._last_refill = now
+            
+            if self._tokens < 1:
+                raise RateLimited("Hourly CAPTCHA solve limit reached")
+            if min_interval and now - self._last_v2_solve < min_interval:
+                raise RateLimited("reCAPTCHA v2 solved too recently")
+            
+            self._tokens -= 1
+            if min_interval:
+                self._last_v2_solve = now
+    
+    def _get_solver(self, solver_class):
+        """Return this thread's configured instance of an AntiCaptcha client class."""
+        solvers = getattr(self._local, "solvers", None)
+        if solvers is None:
+            solvers = self._local.solvers = {}
+        
+        solver = solvers.get(solver_class)
+        if solver is None:
+            solver = solvers[solver_class] = solver_class()
+            solver.set_key(self.api_key)
+        solver.set_verbose(1 if self.verbose else 0)
+        return solver
     
     def solve_recaptcha_v2(self, site_key: str, url: str) -> Optional[str]:
         """Solve reCAPTCHA v2 using AntiCaptcha.
@@ -33,11 +158,10 @@ class CaptchaSolver:
             Solution string or None if failed
         """
         try:
+            self._acquire(_V2_MIN_INTERVAL)
             activity_logger.info(f"Attempting to solve reCAPTCHA v2 on {url}")
             
-            solver = recaptchaV2Proxyless()
-            solver.set_verbose(1 if self.verbose else 0)
-            solver.set_key(self.api_key)
+            solver = self._get_solver(recaptchaV2Proxyless)
             solver.set_website_url(url)
             solver.set_website_key(site_key)
             
@@ -48,6 +172,9 @@ class CaptchaSolver:
             else:
                 error_logger.error(f"Failed to solve reCAPTCHA v2: {solver.error_code}")
                 return None
+        except RateLimited as e:
+            activity_logger.info(f"Skipping reCAPTCHA v2 solve: {str(e)}")
+            return None
         except Exception as e:
             error_logger.error(f"Error solving reCAPTCHA v2: {str(e)}")
             return None
@@ -65,11 +192,10 @@ class CaptchaSolver:
             Solution string or None if failed
         """
         try:
+            self._acquire()
             activity_logger.info(f"Attempting to solve reCAPTCHA v3 on {url}")
             
-            solver = recaptchaV3Proxyless()
-            solver.set_verbose(1 if self.verbose else 0)
-            solver.set_key(self.api_key)
+            solver = self._get_solver(recaptchaV3Proxyless)
             solver.set_website_url(url)
             solver.set_website_key(site_key)
             solver.set_action(action)
@@ -82,6 +208,9 @@ class CaptchaSolver:
             else:
                 error_logger.error(f"Failed to solve reCAPTCHA v3: {solver.error_code}")
                 return None
+        except RateLimited as e:
+            activity_logger.info(f"Skipping reCAPTCHA v3 solve: {str(e)}")
+            return None
         except Exception as e:
             error_logger.error(f"Error solving reCAPTCHA v3: {str(e)}")
             return None
@@ -96,23 +225,53 @@ class CaptchaSolver:
             Solution text or None if failed
         """
         try:
+            # Retries and re-renders often produce the exact same image
+            with open(image_path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+            cached = self._img_cache.get(digest)
+            if cached and time.monotonic() - cached[1] < _IMAGE_TTL:
+                activity_logger.info(f"Reusing cached image CAPTCHA solution: {cached[0]}")
+                return cached[0]
+            
+            self._acquire()
             activity_logger.info(f"Attempting to solve image CAPTCHA from {image_path}")
             
-            solver = imagecaptcha()
-            solver.set_verbose(1 if self.verbose else 0)
-            solver.set_key(self.api_key)
+            solver = self._get_solver(imagecaptcha)
             
             result = solver.solve_and_return_solution(image_path)
             if result != 0:
                 activity_logger.info(f"Successfully solved image CAPTCHA: {result}")
+                self._cache_image_answer(digest, result)
                 return result
             else:
                 error_logger.error(f"Failed to solve image CAPTCHA: {solver.error_code}")
                 return None
+        except RateLimited as e:
+            activity_logger.info(f"Skipping image CAPTCHA solve: {str(e)}")
+            return None
         except Exception as e:
             error_logger.error(f"Error solving image CAPTCHA: {str(e)}")
             return None
     
+    async def solve_recaptcha_v2_async(self, site_key: str, url: str) -> Optional[str]:
+        """Solve reCAPTCHA v2 without blocking the event loop.
+        
+        The blocking AntiCaptcha polling runs in the solver's thread pool, so
+        other coroutines keep running while the solve is pending.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.solve_recaptcha_v2, site_key, url)
+    
+    async def solve_recaptcha_v3_async(self, site_key: str, url: str, action: str = "verify", min_score: float = 0.7) -> Optional[str]:
+        """Solve reCAPTCHA v3 without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.solve_recaptcha_v3, site_key, url, action, min_score)
+    
+    async def solve_image_captcha_async(self, image_path: str) -> Optional[str]:
+        """Solve an image CAPTCHA without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.solve_image_captcha, image_path)
+    
     def detect_and_solve_captcha(self, driver: webdriver.Chrome) -> bool:
         """Detect and solve any CAPTCHA on the current page.
         
@@ -123,48 +282,53 @@ class CaptchaSolver:
             True if CAPTCHA was detected and solved, False otherwise
         """
         try:
-            page_source = driver.page_source.lower()
-            current_url = driver.current_url
+            signals = driver.execute_script(_DETECT_CAPTCHA_JS)
+            if not signals:
+                return False
+            current_url = signals["url"]
             
             # Check for reCAPTCHA v2
-            if "recaptcha" in page_source or "g-recaptcha" in page_source:
+            if signals["hasRecaptcha"]:
                 activity_logger.info("reCAPTCHA detected")
                 
-                # Extract site key
-                site_key_match = re.search(r'data-sitekey="([^"]+)"', driver.page_source)
-                if site_key_match:
-                    site_key = site_key_match.group(1)
+                # Extract site key from the widget, falling back to the
+                # serialized page for keys that only appear in markup such as
+                # <noscript> blocks
+                site_key = signals["sitekey"]
+                if not site_key:
+                    page_bytes = driver.page_source.encode('ascii', 'ignore')
+                    site_key_match = _SITEKEY_RE.search(page_bytes)
+                    site_key = site_key_match.group(1).decode('ascii') if site_key_match else None
+                
+                if site_key:
                     solution = self.solve_recaptcha_v2(site_key, current_url)
                     
                     if solution:
                         # Inject the solution
-                        driver.execute_script(f'document.getElementById("g-recaptcha-response").innerHTML="{solution}";')
+                        driver.execute_script(_INJECT_TOKEN_JS, solution)
                         
                         # Try to find and submit the form containing the CAPTCHA
                         try:
-                            captcha_form = driver.find_element_by_css_selector("form:has(div.g-recaptcha)") or \
-                                        driver.find_element_by_id("captcha-form") or \
-                                        driver.find_element_by_css_selector("form")
-                            
+                            captcha_form = driver.execute_script(_FIND_CAPTCHA_FORM_JS)
                             if captcha_form:
                                 captcha_form.submit()
                                 activity_logger.info("CAPTCHA form submitted")
                                 return True
-                        except:
-                            activity_logger.info("Could not find or submit CAPTCHA form")
+                            activity_logger.info("Could not find CAPTCHA form")
+                        except WebDriverException:
+                            activity_logger.info("Could not submit CAPTCHA form")
             
             # Check for "unusual traffic" or "suspicious activity" messages
-            elif "unusual traffic" in page_source or "suspicious activity" in page_source:
+            elif signals["unusual"]:
                 activity_logger.info("Unusual traffic detection page encountered")
                 
                 # Look for any visible forms or buttons to continue
-                try:
-                    continue_button = driver.find_element_by_xpath("//button[contains(text(), 'Continue') or contains(text(), 'Verify') or contains(text(), 'I am human')]")
-                    continue_button.click()
+                continue_buttons = driver.find_elements(By.XPATH, _CONTINUE_XPATH)
+                if continue_buttons:
+                    continue_buttons[0].click()
                     activity_logger.info("Clicked continue button on unusual traffic page")
                     return True
-                except:
-                    activity_logger.info("No continue button found on unusual traffic page")
+                activity_logger.info("No continue button found on unusual traffic page")
             
             return False
             
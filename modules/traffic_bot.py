@@ -1,21 +1,253 @@
 import os
+import re
+import bisect
 import time
 import random
 import string
 import logging
 import threading
 import queue
+import itertools
+import collections
+from array import array
+from enum import IntEnum
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from urllib.parse import urlparse
+from typing import Dict, List, Any, Optional, Tuple
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
 
 # Get loggers
 activity_logger = logging.getLogger("activity")
 error_logger = logging.getLogger("error")
 
+# Per-thread random generators, so workers don't share one generator's state
+_thread_local = threading.local()
+
+def _rng() -> random.Random:
+    """Return the calling thread's random generator."""
+    try:
+        return _thread_local.rng
+    except AttributeError:
+        _thread_local.rng = random.Random()
+        return _thread_local.rng
+
+# Seconds between schedule checks and stats snapshot refreshes while running
+_STATS_REFRESH_INTERVAL = 0.5
+
+# Scheme and host of an absolute http(s) URL
+_NETLOC_RE = re.compile(r'^https?://([^/?#]+)', re.IGNORECASE)
+
+# Scroll the window down by arguments[0] pixels
+_SCROLL_BY_JS = "window.scrollBy(0, arguments[0]);"
+
+# Every HTML link on the page as [href, element], fetched in one round trip.
+# SVG links expose href as an object, so they are skipped
+_LINKS_JS = """
+return Array.from(document.getElementsByTagName('a'))
+    .filter(a => typeof a.href === 'string')
+    .map(a => [a.href, a]);
+"""
+
+# External result links on a Google results page, falling back to
+# a[jsname] anchors when the classic div.g layout isn't present
+_SEARCH_RESULTS_JS = """
+let links = document.querySelectorAll('div.g a');
+if (!links.length) {
+    links = document.querySelectorAll('a[jsname]');
+}
+return Array.from(links, a => a.href).filter(h => h && h.indexOf('google.com') === -1);
+"""
+
+# Page interactions and their cumulative weights (60% scroll, 20% mouse
+# move, 10% random click, 10% form interaction)
+_INTERACTIONS = ("scroll", "mouse_move", "click_nowhere", "form_interact")
+_INTERACTION_CDF = (0.6, 0.8, 0.9)
+
+# Plays back planned interactions with in-page timers. Each event has an
+# offset t in seconds and a kind; mouse positions are viewport fractions so
+# they stay on screen whatever the window size
+_PAGE_TIMELINE_JS = """
+arguments[0].forEach(function (event) {
+    setTimeout(function () {
+        try {
+            if (event.kind === 'scroll') {
+                window.scrollBy(0, event.dy);
+                return;
+            }
+            var x = Math.round(event.x * window.innerWidth);
+            var y = Math.round(event.y * window.innerHeight);
+            var target = event.kind === 'click' ? document.elementFromPoint(x, y) : document;
+            if (target) {
+                target.dispatchEvent(new MouseEvent(event.kind, {
+                    view: window, bubbles: true, cancelable: true, clientX: x, clientY: y
+                }));
+            }
+        } catch (e) {}
+    }, event.t * 1000);
+});
+"""
+
+# Text-like inputs inside forms; inputs without a type attribute are text
+_FORM_TEXT_INPUT_SELECTOR = "form input:is([type='text' i], [type='email' i], [type='search' i], :not([type]))"
+
+# Common AdSense selectors
+_AD_SELECTORS = ", ".join((
+    "ins.adsbygoogle",
+    "iframe[id^='google_ads']",
+    "div[id^='div-gpt-ad']",
+    "div[class*='advert']",
+    "div[class*='ad-container']"
+))
+
+# Covers every element matching arguments[0] with a transparent barrier and
+# returns how many were found. Barriers are appended in one fragment so the
+# page reflows once rather than once per ad. With arguments[1] false the ads
+# are only counted
+_ADSENSE_BARRIER_JS = """
+var ads = document.querySelectorAll(arguments[0]);
+if (!arguments[1]) {
+    return ads.length;
+}
+var fragment = document.createDocumentFragment();
+for (var i = 0; i < ads.length; i++) {
+    var rect = ads[i].getBoundingClientRect();
+    var barrier = document.createElement('div');
+    barrier.style.position = 'absolute';
+    barrier.style.top = (rect.top - 10) + 'px';
+    barrier.style.left = (rect.left - 10) + 'px';
+    barrier.style.width = (rect.width + 20) + 'px';
+    barrier.style.height = (rect.height + 20) + 'px';
+    barrier.style.zIndex = '9999';
+    barrier.style.background = 'transparent';
+    barrier.style.pointerEvents = 'none';
+    barrier.setAttribute('data-ad-barrier', 'true');
+    fragment.appendChild(barrier);
+}
+if (ads.length && document.body) {
+    document.body.appendChild(fragment);
+}
+return ads.length;
+"""
+
+# Fallback CAPTCHA markers, matched without lowercasing the page first
+_CAPTCHA_RE = re.compile(r'unusual traffic|recaptcha', re.IGNORECASE)
+
+# Evaluated in the browser so only a boolean crosses the WebDriver connection
+_CAPTCHA_TEST_JS = """(
+    !!document.querySelector("iframe[src*='recaptcha'], .g-recaptcha, [data-sitekey], #captcha-form") ||
+    /unusual traffic|recaptcha/i.test(document.body ? document.body.textContent : '')
+)"""
+_HAS_CAPTCHA_JS = "return " + _CAPTCHA_TEST_JS + ";"
+
+# Title and CAPTCHA flag after a navigation; pages without a title failed to
+# load, so the CAPTCHA test is skipped for them
+_PAGE_STATE_JS = """
+var title = document.title;
+return {title: title, captcha: !!title && """ + _CAPTCHA_TEST_JS + """};
+"""
+
+class StatIdx(IntEnum):
+    """Slots of the visit counters; names match the keys reported by get_stats."""
+    VISITS = 0
+    SUCCESSFUL_VISITS = 1
+    FAILED_VISITS = 2
+    CAPTCHAS_SOLVED = 3
+    VPN_SWITCHES = 4
+    PROXY_SWITCHES = 5
+    ADSENSE_IMPRESSIONS = 6
+    SOCIAL_TRAFFIC = 7
+    SEARCH_TRAFFIC = 8
+    DIRECT_TRAFFIC = 9
+    REFERRAL_TRAFFIC = 10
+    MOBILE_VISITS = 11
+    DESKTOP_VISITS = 12
+    TABLET_VISITS = 13
+
+# Stat keys in StatIdx order
+_STAT_KEYS = tuple(idx.name.lower() for idx in StatIdx)
+
+# Idle polling interval bounds for WorkStealingQueue.get
+_MIN_POLL_DELAY = 0.01
+_MAX_POLL_DELAY = 0.5
+
+class WorkStealingQueue:
+    """Task queue with one deque per worker instead of a single locked queue.
+    
+    Workers pop from the front of their own deque and, when it is empty,
+    steal from the back of a peer's. deque appends and pops are atomic, so
+    no lock is taken on either path.
+    """
+    
+    def __init__(self, num_workers: int = 1):
+        """Create a queue for the given number of workers."""
+        self._deques = [collections.deque() for _ in range(max(1, num_workers))]
+        self._next_index = itertools.count()
+    
+    def drain(self):
+        """Remove and yield every queued task.
+        
+        Tasks are popped one at a time, so workers may still be taking from
+        the queue meanwhile.
+        """
+        for tasks in self._deques:
+            while True:
+                try:
+                    yield tasks.popleft()
+                except IndexError:
+                    break
+    
+    def put(self, task, index: Optional[int] = None) -> None:
+        """Add a task to the given worker's deque, or round-robin if None."""
+        deques = self._deques
+        if index is None:
+            index = next(self._next_index)
+        deques[index % len(deques)].append(task)
+    
+    def get(self, index: int, timeout: Optional[float] = None):
+        """Take a task for the given worker, stealing from peers when idle.
+        
+        Args:
+            index: The calling worker's index
+            timeout: Seconds to wait for a task, or None to wait forever
+            
+        Raises:
+            queue.Empty: If no task became available within timeout
+        """
+        rng = _rng()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = _MIN_POLL_DELAY
+        while True:
+            deques = self._deques
+            count = len(deques)
+            try:
+                return deques[index % count].popleft()
+            except IndexError:
+                pass
+            
+            # Steal from the back of a random peer's deque, away from its owner
+            offset = rng.randrange(count)
+            for i in range(count):
+                try:
+                    return deques[(offset + i) % count].pop()
+                except IndexError:
+                    continue
+            
+            # Back off exponentially while idle so empty queues cost little
+            if deadline is None:
+                time.sleep(delay)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+                time.sleep(min(delay, remaining))
+            delay = min(delay * 2, _MAX_POLL_DELAY)
+    
+    def qsize(self) -> int:
+        """Return the approximate number of queued tasks."""
+        return sum(len(tasks) for tasks in self._deques)
+
 class TrafficBot:
     """Main class for traffic generation bot."""
     
@@ -34,38 +266,63 @@ class TrafficBot:
         # Bot settings
         self.keywords = []
         self.urls = []
+        self._keyword_set = set()  # Membership index for keywords
+        self._url_set = set()  # Membership index for urls
         self.running = False
         self.paused = False
         self.worker_threads = []
-        self.task_queue = queue.Queue()
-        self.custom_tracking_urls = {}  # Map original URLs to tracking URLs
-        
-        # Statistics
-        self.stats = {
-            "visits": 0,
-            "successful_visits": 0,
-            "failed_visits": 0,
-            "captchas_solved": 0,
-            "start_time": None,
-            "last_visit": None,
-            "vpn_switches": 0,
-            "proxy_switches": 0,
-            "adsense_impressions": 0,
-            "social_traffic": 0,
-            "search_traffic": 0,
-            "direct_traffic": 0,
-            "referral_traffic": 0,
-            "mobile_visits": 0,
-            "desktop_visits": 0,
-            "tablet_visits": 0
-        }
+        self.task_queue = WorkStealingQueue()
+        self.custom_tracking_urls = {}  # Map original URLs to tracking URLs (replaced, never mutated)
+        self._tracking_lock = threading.Lock()
+        
+        # Statistics, counted in a flat array indexed by StatIdx
+        self._counters = array('Q', [0] * len(StatIdx))
+        self._counters_lock = threading.Lock()
+        self.start_time = None
+        self.last_visit = None
+        
+        # Published copy of the stats, replaced as a whole on each refresh
+        self._stats_snapshot: Dict[str, Any] = {}
+        
+        # Set while the schedule allows traffic; workers wait on it
+        self._gate = threading.Event()
+        
+        # Set while not paused; paused workers wait on it
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._monitor_thread = None
+        
+        # Set when the current run stops; each run gets a new one
+        self._stop_event = threading.Event()
+    
+    def set_keywords(self, keywords) -> int:
+        """Replace the keywords, dropping empty and duplicate entries.
+        
+        Returns:
+            Number of keywords kept
+        """
+        unique_keywords = dict.fromkeys(keyword for keyword in keywords if keyword)
+        self._keyword_set = set(unique_keywords)
+        self.keywords = list(unique_keywords)
+        return len(self.keywords)
+    
+    def set_urls(self, urls) -> int:
+        """Replace the URLs, dropping empty and duplicate entries.
+        
+        Returns:
+            Number of URLs kept
+        """
+        unique_urls = dict.fromkeys(url for url in urls if url)
+        self._url_set = set(unique_urls)
+        self.urls = list(unique_urls)
+        return len(self.urls)
     
     def load_keywords(self, keyword_file: str) -> None:
         """Load keywords from a file."""
         try:
             with open(keyword_file, 'r') as f:
-                self.keywords = [line.strip() for line in f if line.strip()]
-            activity_logger.info(f"Loaded {len(self.keywords)} keywords from {keyword_file}")
+                count = self.set_keywords(line.strip() for line in f)
+            activity_logger.info(f"Loaded {count} keywords from {keyword_file}")
         except Exception as e:
             error_logger.error(f"Failed to load keywords: {str(e)}")
     
@@ -73,63 +330,53 @@ class TrafficBot:
         """Load URLs from a file."""
         try:
             with open(url_file, 'r') as f:
-                self.urls = [line.strip() for line in f if line.strip()]
-            activity_logger.info(f"Loaded {len(self.urls)} URLs from {url_file}")
+                count = self.set_urls(line.strip() for line in f)
+            activity_logger.info(f"Loaded {count} URLs from {url_file}")
         except Exception as e:
             error_logger.error(f"Failed to load URLs: {str(e)}")
     
     def add_keyword(self, keyword: str) -> None:
         """Add a single keyword to the list."""
-        if keyword and keyword not in self.keywords:
+        if keyword and keyword not in self._keyword_set:
+            self._keyword_set.add(keyword)
             self.keywords.append(keyword)
             activity_logger.info(f"Added keyword: {keyword}")
     
     def add_url(self, url: str) -> None:
         """Add a single URL to the list."""
-        if url and url not in self.urls:
+        if url and url not in self._url_set:
+            self._url_set.add(url)
             self.urls.append(url)
             activity_logger.info(f"Added URL: {url}")
     
-    def check_schedule(self) -> bool:
-        """Check if we should generate traffic based on the scheduler."""
-        if not self.scheduler.should_generate_traffic():
-            activity_logger.info("Skipping traffic generation due to scheduling constraints")
-            return False
-        return True
-    
     def search_google(self, keyword: str) -> List[str]:
         """Search Google for a keyword and return the results."""
-        # Check if we should proceed based on scheduling
-        if not self.check_schedule():
-            return []
+        rng = _rng()
         
         results = []
         try:
             # Decide if we should use VPN or proxy
             use_vpn = False
             use_proxy = False
+            driver = None  # Cleared once released, as the pool may hand it on
             
             # Randomly choose between VPN and proxy based on availability
-            use_vpn_providers = [p for p in self.vpn_manager.vpn_providers 
-                               if self.vpn_manager.vpn_providers[p]['enabled'] and 
-                                  self.vpn_manager.vpn_providers[p]['regions']]
-            
-            if use_vpn_providers and random.random() > 0.5:
+            if self.vpn_manager.has_ready_vpn() and rng.random() > 0.5:
                 # Use a VPN
                 provider, region = self.vpn_manager.get_random_vpn()
                 if provider and region:
                     self.vpn_manager.connect_vpn(provider, region)
                     use_vpn = True
-                    self.stats["vpn_switches"] += 1
+                    self._incr(StatIdx.VPN_SWITCHES)
             
             if not use_vpn and self.vpn_manager.proxies and self.vpn_manager.use_proxies:
                 # Use a proxy
                 self.vpn_manager.get_random_proxy()
                 use_proxy = True
-                self.stats["proxy_switches"] += 1
+                self._incr(StatIdx.PROXY_SWITCHES)
             
             # Get driver with the proper configuration
-            driver = self.browser_manager.get_driver(use_proxy=use_proxy)
+            driver = self.browser_manager.acquire(use_proxy=use_proxy)
             if not driver:
                 return results
             
@@ -139,45 +386,29 @@ class TrafficBot:
             driver.get(search_url)
             
             # Random delay to mimic human behavior
-            time.sleep(random.uniform(1, 3))
+            time.sleep(rng.uniform(1, 3))
             
             # Check for CAPTCHA
-            if "unusual traffic" in driver.page_source.lower() or "recaptcha" in driver.page_source.lower():
+            if self._has_captcha(driver):
                 activity_logger.info("CAPTCHA detected, attempting to solve...")
                 solved = self.browser_manager.captcha_solver.detect_and_solve_captcha(driver)
                 if solved:
-                    self.stats["captchas_solved"] += 1
-                    time.sleep(random.uniform(2, 4))
+                    self._incr(StatIdx.CAPTCHAS_SOLVED)
+                    time.sleep(rng.uniform(2, 4))
             
             # Extract search results
-            try:
-                links = driver.find_elements(By.CSS_SELECTOR, "div.g a")
-            except:
-                links = []
-                
-            if not links:
-                try:
-                    links = driver.find_elements(By.CSS_SELECTOR, "a[jsname]")
-                except:
-                    links = []
-            
-            for link in links:
-                try:
-                    href = link.get_attribute("href")
-                    if href and "google.com" not in href:
-                        results.append(href)
-                except:
-                    continue
+            results = driver.execute_script(_SEARCH_RESULTS_JS)
             
             activity_logger.info(f"Found {len(results)} search results for: {keyword}")
-            self.browser_manager.close_driver(driver)
+            self.browser_manager.release(driver)
+            driver = None
             
             # Record the visit in scheduler
             self.scheduler.record_visit()
         
         except Exception as e:
             error_logger.error(f"Error searching Google for '{keyword}': {str(e)}")
-            if 'driver' in locals():
+            if driver is not None:
                 self.browser_manager.close_driver(driver)
         finally:
             # Disconnect VPN if using
@@ -188,102 +419,121 @@ class TrafficBot:
     
     def add_tracking_url(self, original_url: str, tracking_url: str) -> None:
         """Add a custom tracking URL that will be used instead of the original."""
-        self.custom_tracking_urls[original_url] = tracking_url
+        # Copy-on-write so readers can use the current dict without locking
+        with self._tracking_lock:
+            tracking_urls = dict(self.custom_tracking_urls)
+            tracking_urls[original_url] = tracking_url
+            self.custom_tracking_urls = tracking_urls
         activity_logger.info(f"Added tracking URL: {tracking_url} for {original_url}")
     
+    def remove_tracking_url(self, original_url: str) -> bool:
+        """Remove the custom tracking URL for an original URL.
+        
+        Returns:
+            True if a tracking URL was removed, False if none was set
+        """
+        with self._tracking_lock:
+            if original_url not in self.custom_tracking_urls:
+                return False
+            tracking_urls = dict(self.custom_tracking_urls)
+            del tracking_urls[original_url]
+            self.custom_tracking_urls = tracking_urls
+        activity_logger.info(f"Removed tracking URL for {original_url}")
+        return True
+    
     def get_tracking_url(self, url: str) -> str:
         """Get the tracking URL for a given original URL if it exists."""
         return self.custom_tracking_urls.get(url, url)
     
     def visit_url(self, url: str) -> bool:
         """Visit a URL and simulate human behavior."""
-        # Check if we should proceed based on scheduling
-        if not self.check_schedule():
-            return False
+        rng = _rng()
         
-        # Check if we have a custom tracking URL for this URL
-        tracking_url = self.get_tracking_url(url)
-        if tracking_url != url:
-            activity_logger.info(f"Using tracking URL: {tracking_url} instead of {url}")
-            url = tracking_url
+        # Check if we have a custom tracking URL for this URL; most runs
+        # have none, so skip the lookup when the map is empty
+        tracking_urls = self.custom_tracking_urls
+        if tracking_urls:
+            tracking_url = tracking_urls.get(url)
+            if tracking_url is not None:
+                activity_logger.info(f"Using tracking URL: {tracking_url} instead of {url}")
+                url = tracking_url
         
-        self.stats["visits"] += 1
-        self.stats["last_visit"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._incr(StatIdx.VISITS)
+        self.last_visit = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
             # Decide if we should use VPN or proxy
             use_vpn = False
             use_proxy = False
+            driver = None  # Cleared once released, as the pool may hand it on
             
             # Randomly choose between VPN and proxy based on availability
-            use_vpn_providers = [p for p in self.vpn_manager.vpn_providers 
-                               if self.vpn_manager.vpn_providers[p]['enabled'] and 
-                                  self.vpn_manager.vpn_providers[p]['regions']]
-            
-            if use_vpn_providers and random.random() > 0.5:
+            if self.vpn_manager.has_ready_vpn() and rng.random() > 0.5:
                 # Use a VPN
                 provider, region = self.vpn_manager.get_random_vpn()
                 if provider and region:
                     self.vpn_manager.connect_vpn(provider, region)
                     use_vpn = True
-                    self.stats["vpn_switches"] += 1
+                    self._incr(StatIdx.VPN_SWITCHES)
             
             if not use_vpn and self.vpn_manager.proxies and self.vpn_manager.use_proxies:
                 # Use a proxy
                 self.vpn_manager.get_random_proxy()
                 use_proxy = True
-                self.stats["proxy_switches"] += 1
+                self._incr(StatIdx.PROXY_SWITCHES)
             
             # Select a device type based on behavior profile
             device_type = self.browser_manager.behavior_profile.get_random_device()
             
             # Update device type stats
             if device_type == "desktop":
-                self.stats["desktop_visits"] += 1
+                self._incr(StatIdx.DESKTOP_VISITS)
             elif device_type == "mobile":
-                self.stats["mobile_visits"] += 1
+                self._incr(StatIdx.MOBILE_VISITS)
             elif device_type == "tablet":
-                self.stats["tablet_visits"] += 1
+                self._incr(StatIdx.TABLET_VISITS)
             
             # Get driver with the proper configuration
-            driver = self.browser_manager.get_driver(use_proxy=use_proxy, device_type=device_type)
+            driver = self.browser_manager.acquire(use_proxy=use_proxy, device_type=device_type)
             if not driver:
-                self.stats["failed_visits"] += 1
+                self._incr(StatIdx.FAILED_VISITS)
                 return False
             
             # Track referrer type
             referrer_type = self.browser_manager.behavior_profile.get_random_referrer()
             if referrer_type.startswith("search_"):
-                self.stats["search_traffic"] += 1
+                self._incr(StatIdx.SEARCH_TRAFFIC)
             elif referrer_type.startswith("social_"):
-                self.stats["social_traffic"] += 1
+                self._incr(StatIdx.SOCIAL_TRAFFIC)
             elif referrer_type == "direct":
-                self.stats["direct_traffic"] += 1
+                self._incr(StatIdx.DIRECT_TRAFFIC)
             elif referrer_type == "referral":
-                self.stats["referral_traffic"] += 1
+                self._incr(StatIdx.REFERRAL_TRAFFIC)
             
             # Visit the URL
             activity_logger.info(f"Visiting URL: {url} with device type: {device_type}")
             driver.get(url)
             
             # Check if the page loaded properly
-            if driver.title == "":
+            title, has_captcha = self._page_state(driver)
+            if title == "":
                 error_logger.error(f"Failed to load page: {url}")
-                self.browser_manager.close_driver(driver)
-                self.stats["failed_visits"] += 1
+                self.browser_manager.release(driver)
+                driver = None
+                self._incr(StatIdx.FAILED_VISITS)
                 return False
             
             # Check for CAPTCHA
-            if "unusual traffic" in driver.page_source.lower() or "recaptcha" in driver.page_source.lower():
+            if has_captcha:
                 activity_logger.info("CAPTCHA detected, attempting to solve...")
                 solved = self.browser_manager.captcha_solver.detect_and_solve_captcha(driver)
                 if solved:
-                    self.stats["captchas_solved"] += 1
-                    time.sleep(random.uniform(2, 4))
+                    self._incr(StatIdx.CAPTCHAS_SOLVED)
+                    time.sleep(rng.uniform(2, 4))
             
             # Get visit duration from behavior profile
             min_duration, max_duration = self.browser_manager.behavior_profile.get_visit_duration()
-            visit_duration = random.uniform(min_duration, max_duration)
+            visit_duration = rng.uniform(min_duration, max_duration)
             activity_logger.info(f"Planning to stay on site for {visit_duration:.1f} seconds")
             
             # Determine if this should be a bounce or full visit
@@ -292,15 +542,16 @@ class TrafficBot:
             if should_bounce:
                 # Simulate a bounce - short visit with minimal interaction
                 activity_logger.info("Simulating bounce visit")
-                time.sleep(random.uniform(3, 8))
+                time.sleep(rng.uniform(3, 8))
                 
                 # Minimal scroll
-                scroll_amount = random.randint(100, 300)
-                driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
-                time.sleep(random.uniform(1, 3))
+                scroll_amount = rng.randint(100, 300)
+                driver.execute_script(_SCROLL_BY_JS, scroll_amount)
+                time.sleep(rng.uniform(1, 3))
                 
-                self.browser_manager.close_driver(driver)
-                self.stats["successful_visits"] += 1
+                self.browser_manager.release(driver)
+                driver = None
+                self._incr(StatIdx.SUCCESSFUL_VISITS)
                 
                 # Record the visit in scheduler
                 self.scheduler.record_visit()
@@ -336,10 +587,9 @@ class TrafficBot:
                     break
                 
                 # Select a random link
-                link_to_click = random.choice(internal_links)
+                href, link_to_click = rng.choice(internal_links)
                 
                 try:
-                    href = link_to_click.get_attribute("href")
                     activity_logger.info(f"Navigating to subpage ({i+1}/{subpage_count}): {href}")
                     
                     # Record the current URL
@@ -348,7 +598,7 @@ class TrafficBot:
                     
                     # Click the link
                     link_to_click.click()
-                    time.sleep(random.uniform(2, 4))
+                    time.sleep(rng.uniform(2, 4))
                     
                     # Interact with the subpage
                     self._interact_with_page(driver, subpage_time)
@@ -358,8 +608,9 @@ class TrafficBot:
                     continue
             
             # End the visit
-            self.browser_manager.close_driver(driver)
-            self.stats["successful_visits"] += 1
+            self.browser_manager.release(driver)
+            driver = None
+            self._incr(StatIdx.SUCCESSFUL_VISITS)
             activity_logger.info(f"Successfully completed visit to: {url}")
             
             # Record the visit in scheduler
@@ -369,62 +620,58 @@ class TrafficBot:
             
         except Exception as e:
             error_logger.error(f"Error visiting '{url}': {str(e)}")
-            if 'driver' in locals():
+            if driver is not None:
                 self.browser_manager.close_driver(driver)
-            self.stats["failed_visits"] += 1
+            self._incr(StatIdx.FAILED_VISITS)
             return False
         finally:
             # Disconnect VPN if using
             if use_vpn:
                 self.vpn_manager.disconnect_all_vpns()
     
+    def _has_captcha(self, driver: webdriver.Chrome) -> bool:
+        """Check whether the loaded page shows a CAPTCHA or a block page."""
+        try:
+            return bool(driver.execute_script(_HAS_CAPTCHA_JS))
+        except WebDriverException:
+            # Scripts can fail on some pages, so scan the serialized source instead
+            return _CAPTCHA_RE.search(driver.page_source) is not None
+    
+    def _page_state(self, driver: webdriver.Chrome) -> Tuple[str, bool]:
+        """Get the page title and whether it shows a CAPTCHA, in one call."""
+        try:
+            state = driver.execute_script(_PAGE_STATE_JS)
+            return state["title"], bool(state["captcha"])
+        except WebDriverException:
+            title = driver.title
+            return title, bool(title) and self._has_captcha(driver)
+    
     def _avoid_adsense_clicks(self, driver: webdriver.Chrome) -> None:
         """Identify AdSense ads and avoid clicking on them."""
         try:
-            # Common AdSense selectors
-            ad_selectors = [
-                "ins.adsbygoogle", 
-                "iframe[id^='google_ads']",
-                "div[id^='div-gpt-ad']",
-                "div[class*='advert']",
-                "div[class*='ad-container']"
-            ]
-            
-            # Find all ad elements
-            ad_elements = []
-            for selector in ad_selectors:
-                ad_elements.extend(driver.find_elements(By.CSS_SELECTOR, selector))
-            
-            if ad_elements:
-                activity_logger.info(f"Found {len(ad_elements)} potential ads on page")
-                self.stats["adsense_impressions"] += 1
-                
-                # Inject JS to create invisible barriers around ads to prevent accidental clicks
-                for i, ad in enumerate(ad_elements):
-                    try:
-                        driver.execute_script("""
-                            var ad = arguments[0];
-                            var rect = ad.getBoundingClientRect();
-                            var barrier = document.createElement('div');
-                            barrier.style.position = 'absolute';
-                            barrier.style.top = (rect.top - 10) + 'px';
-                            barrier.style.left = (rect.left - 10) + 'px';
-                            barrier.style.width = (rect.width + 20) + 'px';
-                            barrier.style.height = (rect.height + 20) + 'px';
-                            barrier.style.zIndex = '9999';
-                            barrier.style.background = 'transparent';
-                            barrier.style.pointerEvents = 'none';
-                            barrier.setAttribute('data-ad-barrier', 'true');
-                            document.body.appendChild(barrier);
-                        """, ad)
-                    except Exception:
-                        continue
+            # Find all ads and put invisible barriers around them to prevent
+            # accidental clicks, in a single call and a single DOM insertion.
+            # Blocked ad networks never load anything clickable, so their
+            # slots are only counted
+            build_barriers = not self.browser_manager.block_ads
+            ad_count = driver.execute_script(_ADSENSE_BARRIER_JS, _AD_SELECTORS, build_barriers)
+            
+            if ad_count:
+                activity_logger.info(f"Found {ad_count} potential ads on page")
+                self._incr(StatIdx.ADSENSE_IMPRESSIONS)
         
         except Exception as e:
             activity_logger.info(f"Error avoiding AdSense: {str(e)}")
     
     def _interact_with_page(self, driver: webdriver.Chrome, duration: float) -> None:
-        """Simulate realistic user interaction with a page for the specified duration."""
+        """Simulate realistic user interaction with a page for the specified duration.
+        
+        Scrolls and mouse events are planned up front and played back by the
+        page itself, so they cost a single WebDriver call. Only form
+        interactions, which need real key input, go through WebDriver at
+        their planned times.
+        """
+        rng = _rng()
         start_time = time.time()
         end_time = start_time + duration
         
@@ -435,147 +682,130 @@ class TrafficBot:
         # Calculate number of interactions based on duration
         num_interactions = max(2, int(duration / 10))
         
-        # Define possible interactions with their weights
-        interactions = [
-            ("scroll", 0.6),
-            ("mouse_move", 0.2),
-            ("click_nowhere", 0.1),
-            ("form_interact", 0.1)
-        ]
-        
+        # Plan the interactions with a pause of 1-5 seconds between them
+        events = []
+        form_offsets = []
+        offset = 0.0
         for _ in range(num_interactions):
-            # Stop if we've exceeded the duration
-            if time.time() >= end_time:
+            # Stop if we'd exceed the duration
+            if offset >= duration:
                 break
             
             # Select a random interaction
-            interaction = random.choices(
-                [i[0] for i in interactions],
-                weights=[i[1] for i in interactions],
-                k=1
-            )[0]
+            interaction = _INTERACTIONS[bisect.bisect(_INTERACTION_CDF, rng.random())]
             
-            # Perform the interaction
             if interaction == "scroll":
                 # Scroll down or up with varying speeds
-                direction = random.choice(["down", "up"])
-                speed = random.randint(100, 800)
-                
-                if direction == "down":
-                    driver.execute_script(f"window.scrollBy(0, {speed});")
-                else:
-                    driver.execute_script(f"window.scrollBy(0, -{speed});")
+                direction = rng.choice(["down", "up"])
+                speed = rng.randint(100, 800)
+                events.append({"t": offset, "kind": "scroll", "dy": speed if direction == "down" else -speed})
             
             elif interaction == "mouse_move":
                 # Simulate mouse movement (doesn't actually move in headless, but adds JS events)
-                try:
-                    x = random.randint(0, driver.execute_script("return window.innerWidth;"))
-                    y = random.randint(0, driver.execute_script("return window.innerHeight;"))
-                    
-                    driver.execute_script(
-                        f"var e = new MouseEvent('mousemove', {{'view': window, 'bubbles': true, "
-                        f"'cancelable': true, 'clientX': {x}, 'clientY': {y}}}); "
-                        f"document.dispatchEvent(e);"
-                    )
-                except Exception as e:
-                    activity_logger.info(f"Mouse move error: {str(e)}")
+                events.append({"t": offset, "kind": "mousemove", "x": rng.random(), "y": rng.random()})
             
             elif interaction == "click_nowhere":
                 # Random click on page (not on a specific element)
-                try:
-                    x = random.randint(0, driver.execute_script("return window.innerWidth;"))
-                    y = random.randint(0, driver.execute_script("return window.innerHeight;"))
-                    
-                    driver.execute_script(
-                        f"var e = new MouseEvent('click', {{'view': window, 'bubbles': true, "
-                        f"'cancelable': true, 'clientX': {x}, 'clientY': {y}}}); "
-                        f"document.elementFromPoint({x}, {y}).dispatchEvent(e);"
-                    )
-                except Exception as e:
-                    activity_logger.info(f"Click nowhere error: {str(e)}")
+                events.append({"t": offset, "kind": "click", "x": rng.random(), "y": rng.random()})
             
-            elif interaction == "form_interact" and random.random() < self.browser_manager.behavior_profile.form_interaction_probability:
-                # Interact with forms if any exist
-                try:
-                    forms = driver.find_elements(By.TAG_NAME, "form")
-                    if forms:
-                        form = random.choice(forms)
-                        inputs = form.find_elements(By.TAG_NAME, "input")
-                        
-                        text_inputs = []
-                        for input_elem in inputs:
-                            input_type = input_elem.get_attribute("type")
-                            if input_type in ["text", "email", "search"]:
-                                text_inputs.append(input_elem)
-                        
-                        if text_inputs:
-                            input_elem = random.choice(text_inputs)
-                            # Just focus the field without submitting
-                            input_elem.click()
-                            # Type something random but don't submit
-                            random_text = "".join(random.choice(string.ascii_lowercase) for _ in range(5))
-                            input_elem.send_keys(random_text)
-                except Exception as e:
-                    activity_logger.info(f"Form interact error: {str(e)}")
+            elif rng.random() < self.browser_manager.behavior_profile.form_interaction_probability:
+                form_offsets.append(offset)
             
-            # Pause between interactions
-            time.sleep(random.uniform(1, 5))
+            offset += rng.uniform(1, 5)
+        
+        # Hand the scroll and mouse events to the page's own timers
+        if events:
+            driver.execute_script(_PAGE_TIMELINE_JS, events)
+        
+        # Interact with forms at their planned times
+        for form_offset in form_offsets:
+            delay = start_time + form_offset - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self._interact_with_form(driver)
         
         # Ensure we've spent the full duration
         remaining_time = max(0, end_time - time.time())
         if remaining_time > 0:
             time.sleep(remaining_time)
     
-    def _find_internal_links(self, driver: webdriver.Chrome, current_url: str, visited_urls: set) -> list:
-        """Find internal links that haven't been visited yet."""
+    def _interact_with_form(self, driver: webdriver.Chrome) -> None:
+        """Type into a random text field of a random form, without submitting."""
+        rng = _rng()
+        
+        # Interact with forms if any exist
         try:
-            # Parse the domain from the current URL
-            parsed_url = urlparse(current_url)
-            base_domain = parsed_url.netloc
-            
-            # Find all links
-            links = driver.find_elements(By.TAG_NAME, "a")
+            text_inputs = driver.find_elements(By.CSS_SELECTOR, _FORM_TEXT_INPUT_SELECTOR)
+            if text_inputs:
+                input_elem = rng.choice(text_inputs)
+                # Just focus the field without submitting
+                input_elem.click()
+                # Type something random but don't submit
+                random_text = "".join(rng.choice(string.ascii_lowercase) for _ in range(5))
+                input_elem.send_keys(random_text)
+        except Exception as e:
+            activity_logger.info(f"Form interact error: {str(e)}")
+    
+    def _find_internal_links(self, driver: webdriver.Chrome, current_url: str, visited_urls: set) -> List[Tuple[str, Any]]:
+        """Find internal links that haven't been visited yet.
+        
+        Returns:
+            (href, element) pairs for each internal link not visited yet
+        """
+        try:
+            # Get the domain from the current URL
+            base_match = _NETLOC_RE.match(current_url)
+            if not base_match:
+                return []
+            base_domain = base_match.group(1)
+            
+            # Fetch every href with its element in a single call
+            links = driver.execute_script(_LINKS_JS)
             internal_links = []
             
-            for link in links:
-                try:
-                    href = link.get_attribute("href")
-                    
-                    # Skip if no href or not http(s)
-                    if not href or not href.startswith(("http://", "https://")):
-                        continue
-                    
-                    # Parse the link URL
-                    parsed_link = urlparse(href)
-                    link_domain = parsed_link.netloc
-                    
-                    # Check if it's an internal link and not visited yet
-                    if link_domain == base_domain and href not in visited_urls:
-                        internal_links.append(link)
-                except Exception:
-                    continue
+            for href, link in links:
+                # Skip if no href or not http(s)
+                link_match = _NETLOC_RE.match(href) if href else None
+                
+                # Check if it's an internal link and not visited yet
+                if link_match and link_match.group(1) == base_domain and href not in visited_urls:
+                    internal_links.append((href, link))
             
             return internal_links
         except Exception as e:
             activity_logger.info(f"Error finding internal links: {str(e)}")
             return []
     
-    def worker(self) -> None:
-        """Worker thread to process tasks from the queue."""
-        while self.running and not self.paused:
+    def worker(self, index: int, stop_event: threading.Event, task_queue: WorkStealingQueue) -> None:
+        """Worker thread to process tasks from the queue.
+        
+        Args:
+            index: This worker's slot in the task queue
+            stop_event: Set when the run this worker belongs to stops
+            task_queue: The task queue of that run
+        """
+        while not stop_event.is_set():
+            # Sleep while paused, keeping the thread for resume()
+            if self.paused:
+                self._resume_event.wait(timeout=1)
+                continue
+            
+            # Sleep while the schedule doesn't allow traffic
+            if not self._gate.wait(timeout=1):
+                continue
+            
             try:
-                task = self.task_queue.get(timeout=1)
+                task = task_queue.get(index, timeout=1)
                 if task["type"] == "search":
                     results = self.search_google(task["keyword"])
-                    # Queue the results to visit
+                    # Queue the results to visit, on this worker's own deque
                     for url in results[:3]:  # Limit to top 3 results
-                        self.task_queue.put({
+                        task_queue.put({
                             "type": "visit",
                             "url": url
-                        })
+                        }, index)
                 elif task["type"] == "visit":
                     self.visit_url(task["url"])
-                self.task_queue.task_done()
             except queue.Empty:
                 pass
             except Exception as e:
@@ -588,15 +818,32 @@ class TrafficBot:
         
         self.running = True
         self.paused = False
-        self.stats["start_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Open the schedule gate before the workers first check it
+        self._update_gate()
         
-        # Create and start worker threads
-        for _ in range(num_workers):
-            thread = threading.Thread(target=self.worker)
+        # Workers from a previous run may still be finishing a visit, so this
+        # run gets its own stop event and queue rather than sharing theirs.
+        # Tasks left over from that run carry over.
+        self._stop_event = stop_event = threading.Event()
+        task_queue = WorkStealingQueue(num_workers)
+        for task in self.task_queue.drain():
+            task_queue.put(task)
+        self.task_queue = task_queue
+        
+        # Create and start worker threads, each with its own deque
+        for index in range(num_workers):
+            thread = threading.Thread(target=self.worker, args=(index, stop_event, task_queue))
             thread.daemon = True
             thread.start()
             self.worker_threads.append(thread)
         
+        # Keep the schedule gate and the stats snapshot fresh
+        self._monitor_thread = threading.Thread(target=self._monitor_loop, args=(stop_event,))
+        self._monitor_thread.daemon = True
+        self._monitor_thread.start()
+        
         activity_logger.info(f"Started traffic bot with {num_workers} workers")
         
         # Queue initial tasks
@@ -608,6 +855,7 @@ class TrafficBot:
             return
         
         self.paused = True
+        self._resume_event.clear()
         activity_logger.info("Paused traffic bot")
     
     def resume(self) -> None:
@@ -616,6 +864,7 @@ class TrafficBot:
             return
         
         self.paused = False
+        self._resume_event.set()
         activity_logger.info("Resumed traffic bot")
     
     def _queue_tasks(self) -> None:
@@ -641,17 +890,87 @@ class TrafficBot:
         
         self.running = False
         self.paused = False
+        self._stop_event.set()
         
-        # Wait for threads to finish
+        # Release paused workers and those waiting on the schedule so they
+        # see the stop event
+        self._resume_event.set()
+        self._gate.set()
+        
+        # Wait for threads to finish; any still mid-visit exit once it ends
         for thread in self.worker_threads:
             thread.join(timeout=2)
         
+        # The monitor wakes on the stop event, so it exits promptly
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(timeout=2)
+            self._monitor_thread = None
+        
         self.worker_threads = []
+        self.browser_manager.close_all()
         activity_logger.info("Stopped traffic bot")
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get current statistics."""
+    def _incr(self, idx: StatIdx) -> None:
+        """Increment one of the visit counters."""
+        # += on an array slot is not atomic across worker threads
+        with self._counters_lock:
+            self._counters[idx] += 1
+    
+    def _refresh_stats_snapshot(self) -> None:
+        """Rebuild the published stats snapshot."""
+        with self._counters_lock:
+            counts = self._counters.tolist()
+        
         # Combine bot stats with scheduler stats
-        combined_stats = self.stats.copy()
-        combined_stats.update({"scheduler": self.scheduler.get_stats()})
-        return combined_stats
\ No newline at end of file
+        combined_stats = dict(zip(_STAT_KEYS, counts))
+        combined_stats["start_time"] = self.start_time
+        combined_stats["last_visit"] = self.last_visit
+        # The snapshot outlives this call, so it can't share the scheduler's buffer
+        combined_stats["scheduler"] = self.scheduler.get_stats(copy=True)
+        self._stats_snapshot = combined_stats
+    
+    def _update_gate(self) -> None:
+        """Open or close the worker gate based on the scheduler.
+        
+        If the schedule can't be evaluated the gate keeps its current state,
+        so a bad setting can't kill the monitor thread or abort start().
+        """
+        try:
+            allowed = self.scheduler.should_generate_traffic()
+        except Exception as e:
+            error_logger.error(f"Error checking traffic schedule: {str(e)}")
+            return
+        
+        if allowed:
+            self._gate.set()
+        elif self._gate.is_set():
+            self._gate.clear()
+            activity_logger.info("Pausing traffic generation due to scheduling constraints")
+    
+    def _monitor_loop(self, stop_event: threading.Event) -> None:
+        """Check the schedule and refresh the stats snapshot until the run stops.
+        
+        Args:
+            stop_event: Set when the run this monitor belongs to stops
+        """
+        while not stop_event.is_set():
+            self._update_gate()
+            
+            # Keep ticking if a refresh fails rather than freezing the snapshot
+            try:
+                self._refresh_stats_snapshot()
+            except Exception as e:
+                error_logger.error(f"Error refreshing stats: {str(e)}")
+            
+            stop_event.wait(_STATS_REFRESH_INTERVAL)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current statistics.
+        
+        While the bot runs this returns the latest snapshot, at most
+        _STATS_REFRESH_INTERVAL seconds old, without touching worker state.
+        The returned dict is shared and must not be modified.
+        """
+        if not self.running:
+            self._refresh_stats_snapshot()
+        return self._stats_snapshot
\ No newline at end of file
@@ -1,13 +1,99 @@
-import math
-import random
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+import functools
+import threading
+import time
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
 
 # Get loggers
 activity_logger = logging.getLogger("activity")
 error_logger = logging.getLogger("error")
 
+# Seconds a should_generate_traffic answer is reused. Hour boundaries fall
+# on multiples of this, so a cached answer never spans two hours
+_TRAFFIC_CHECK_INTERVAL = 5
+
+def _ceil_div(a: int, b: int) -> int:
+    """Divide a by b, rounding up, without going through floats."""
+    return -(-a // b)
+
+# Targets in priority order; the first one set determines the others
+_TARGET_PRIORITY = ('monthly', 'total', 'daily', 'hourly')
+
+def _derive_targets(period: str, value: int, active_days_count: int, active_hours_count: int, total_days: int) -> Dict[str, int]:
+    """Derive all four visit targets from the target set for one period.
+    
+    Each target is scaled by the number of active hours its period spans.
+    A monthly target is taken as the campaign total, and the given target
+    itself is kept as set.
+    
+    Args:
+        period: Period the target was set for
+        value: Target visits for that period
+        active_days_count: Active days in the campaign
+        active_hours_count: Active hours per active day
+        total_days: Calendar days in the campaign
+        
+    Returns:
+        Targets keyed by period
+    """
+    total_active_hours = active_days_count * active_hours_count
+    span = {
+        'hourly': 1,
+        'daily': active_hours_count,
+        'monthly': total_active_hours,
+        'total': total_active_hours
+    }[period]
+    
+    # Nothing to spread the target over
+    if not span:
+        return {**dict.fromkeys(_TARGET_PRIORITY, 0), period: value}
+    
+    targets = {
+        'hourly': _ceil_div(value, span),
+        'daily': _ceil_div(value * active_hours_count, span),
+        'total': _ceil_div(value * total_active_hours, span)
+    }
+    targets['monthly'] = _ceil_div(value * total_active_hours * 30, span * total_days) if total_days else targets['total']
+    targets[period] = value
+    return targets
+
+@functools.lru_cache(maxsize=8)
+def _weight_matrix(start_weekday: int, total_days: int, active_hours: Tuple[int, ...], active_days_mask: int, mode: str) -> np.ndarray:
+    """Build the normalized visit weights of a frontloaded or backloaded schedule.
+    
+    The weights depend only on the campaign's days and active hours, not
+    on its target, so they are cached and returned read-only.
+    
+    Returns:
+        Weights summing to 1, shaped [active day, active hour]
+    """
+    weekdays = (start_weekday + np.arange(max(total_days, 0))) % 7
+    active_day_indices = ((active_days_mask >> weekdays) & 1).nonzero()[0]
+    hours = np.array(active_hours, dtype=np.intp)
+    
+    # Weight each active hour by its position in the campaign, in hours
+    # since the start of the first day
+    hour_indices = active_day_indices[:, None] * 24 + hours[None, :]
+    if mode == 'frontloaded':
+        # More visits at the beginning, tapering off
+        weights = np.maximum(1, hour_indices.size - hour_indices)
+    else:
+        # Fewer visits at the beginning, ramping up
+        weights = hour_indices + 1
+    
+    weights = weights / weights.sum()
+    weights.flags.writeable = False
+    return weights
+
+def _bitmask(values) -> int:
+    """Build an int with bit n set for each n in values."""
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
 class TrafficScheduler:
     """Class for scheduling traffic generation based on targets and constraints."""
     
@@ -23,6 +109,8 @@ class TrafficScheduler:
         self.end_date = None
         self.active_hours = list(range(24))  # Default to all hours
         self.active_days = list(range(7))    # Default to all days (0=Monday, 6=Sunday)
+        self._active_hours_mask = _bitmask(self.active_hours)  # Bit h set for each active hour
+        self._active_days_mask = _bitmask(self.active_days)    # Bit d set for each active day
         self.schedule_mode = 'even'          # 'even', 'random', 'frontloaded', 'backloaded'
         
         # Tracking
@@ -34,9 +122,34 @@ class TrafficScheduler:
         self.last_day = None
         self.last_month = None
         
-        # Store hourly distribution of visits
-        self.hourly_targets = {}
+        # Store hourly distribution of visits as [day_offset, hour] from start_date
+        self.hourly_targets_arr = np.zeros((0, 24), dtype=np.int32)
+        self._start_ordinal = None  # Day ordinal of hourly_targets_arr row 0
+        self._schedule_days = 0     # Days covered by the schedule
+        self._flat_hourly_target: Optional[int] = None  # Every active hour's target in 'even' mode, instead of the array
         self.daily_targets = {}
+        
+        # Setters only mark the schedule stale; it is recalculated once on
+        # the next read, so a batch of settings costs a single calculation
+        self._dirty = False
+        self._schedule_lock = threading.Lock()
+        
+        # Stats dict reused by get_stats
+        self._stats_lock = threading.Lock()
+        self._stats_buf = {
+            'targets': {},
+            'current': {},
+            'progress': dict.fromkeys(('hourly', 'daily', 'monthly', 'total'), 0),
+            'hourly_target': 0,
+            'schedule_mode': self.schedule_mode,
+            'active_hours': self.active_hours,
+            'active_days': self.active_days
+        }
+        
+        # Last should_generate_traffic answer and the interval it belongs to
+        self._check_bucket = None
+        self._check_result = False
+        self._check_hourly_target = None
     
     def set_target(self, period: str, value: int) -> None:
         """Set target visits for a specific period."""
@@ -44,8 +157,8 @@ class TrafficScheduler:
             self.target_visits[period] = value
             activity_logger.info(f"Set {period} visit target to {value}")
             
-            # Recalculate schedule when targets change
-            self.calculate_schedule()
+            # Mark the schedule for recalculation when targets change
+            self._dirty = True
     
     def set_time_range(self, start_date, end_date) -> None:
         """Set the start and end date for the traffic campaign."""
@@ -53,24 +166,26 @@ class TrafficScheduler:
         self.end_date = end_date
         activity_logger.info(f"Set traffic schedule from {start_date} to {end_date}")
         
-        # Recalculate schedule when dates change
-        self.calculate_schedule()
+        # Mark the schedule for recalculation when dates change
+        self._dirty = True
     
     def set_active_hours(self, hours: list) -> None:
         """Set active hours (0-23) when the bot should generate traffic."""
         self.active_hours = hours
+        self._active_hours_mask = _bitmask(hours)
         activity_logger.info(f"Set active hours to {hours}")
         
-        # Recalculate schedule when active hours change
-        self.calculate_schedule()
+        # Mark the schedule for recalculation when active hours change
+        self._dirty = True
     
     def set_active_days(self, days: list) -> None:
         """Set active days (0-6, Monday=0) when the bot should generate traffic."""
         self.active_days = days
+        self._active_days_mask = _bitmask(days)
         activity_logger.info(f"Set active days to {days}")
         
-        # Recalculate schedule when active days change
-        self.calculate_schedule()
+        # Mark the schedule for recalculation when active days change
+        self._dirty = True
     
     def set_schedule_mode(self, mode: str) -> None:
         """Set the schedule mode for distributing visits."""
@@ -79,8 +194,8 @@ class TrafficScheduler:
             self.schedule_mode = mode
             activity_logger.info(f"Set schedule mode to {mode}")
             
-            # Recalculate schedule when mode changes
-            self.calculate_schedule()
+            # Mark the schedule for recalculation when mode changes
+            self._dirty = True
         else:
             error_logger.error(f"Invalid schedule mode: {mode}")
     
@@ -100,134 +215,117 @@ class TrafficScheduler:
         if not self.start_date:
             self.start_date = now
         
-        # Calculate total days in the campaign
+        # Calculate total days in the campaign, and which of them are active
+        # from their weekdays as offsets from the start date
         total_days = (self.end_date - self.start_date).days + 1
-        active_days_count = sum(1 for d in range(total_days) if (self.start_date + timedelta(days=d)).weekday() in self.active_days)
+        day_offsets = np.arange(max(total_days, 0))
+        weekdays = (self.start_date.weekday() + day_offsets) % 7
+        active_day_mask = ((self._active_days_mask >> weekdays) & 1).astype(bool)
+        active_day_indices = active_day_mask.nonzero()[0]
+        active_days_count = len(active_day_indices)
         active_hours_count = len(self.active_hours)
         total_active_hours = active_days_count * active_hours_count
         
-        # Calculate targets based on priority
-        if self.target_visits['monthly'] > 0:
-            # Monthly target is specified, calculate daily and hourly from it
-            target_per_day = self.target_visits['monthly'] / active_days_count
-            target_per_hour = target_per_day / active_hours_count
-            
-            self.target_visits['daily'] = math.ceil(target_per_day)
-            self.target_visits['hourly'] = math.ceil(target_per_hour)
-            self.target_visits['total'] = self.target_visits['monthly']
-        
-        elif self.target_visits['total'] > 0:
-            # Total target is specified, calculate monthly, daily and hourly from it
-            target_per_month = self.target_visits['total'] / ((total_days / 30) or 1)
-            target_per_day = self.target_visits['total'] / active_days_count
-            target_per_hour = target_per_day / active_hours_count
-            
-            self.target_visits['monthly'] = math.ceil(target_per_month)
-            self.target_visits['daily'] = math.ceil(target_per_day)
-            self.target_visits['hourly'] = math.ceil(target_per_hour)
-        
-        elif self.target_visits['daily'] > 0:
-            # Daily target is specified, calculate hourly and monthly from it
-            target_per_hour = self.target_visits['daily'] / active_hours_count
-            target_per_month = self.target_visits['daily'] * (active_days_count / total_days) * 30
-            target_total = self.target_visits['daily'] * active_days_count
-            
-            self.target_visits['hourly'] = math.ceil(target_per_hour)
-            self.target_visits['monthly'] = math.ceil(target_per_month)
-            self.target_visits['total'] = math.ceil(target_total)
-        
-        elif self.target_visits['hourly'] > 0:
-            # Hourly target is specified, calculate daily, monthly and total from it
-            target_per_day = self.target_visits['hourly'] * active_hours_count
-            target_per_month = target_per_day * (active_days_count / total_days) * 30
-            target_total = self.target_visits['hourly'] * total_active_hours
-            
-            self.target_visits['daily'] = math.ceil(target_per_day)
-            self.target_visits['monthly'] = math.ceil(target_per_month)
-            self.target_visits['total'] = math.ceil(target_total)
-        
-        # Calculate hourly distribution based on schedule mode
-        self.hourly_targets = {}
-        days_range = range((self.end_date - self.start_date).days + 1)
+        # Derive the other targets from the highest priority one that is set
+        for period in _TARGET_PRIORITY:
+            if self.target_visits[period] > 0:
+                self.target_visits.update(_derive_targets(
+                    period, self.target_visits[period], active_days_count, active_hours_count, total_days
+                ))
+                break
+        
+        # Calculate hourly distribution based on schedule mode. Slots outside
+        # the active days and hours stay at zero; an even schedule is a single
+        # value, so it gets no table
+        self._start_ordinal = self.start_date.toordinal()
+        self._schedule_days = len(day_offsets)
+        self._flat_hourly_target = None
+        table_days = 0 if self.schedule_mode == 'even' else len(day_offsets)
+        self.hourly_targets_arr = np.zeros((table_days, 24), dtype=np.int32)
+        hours = np.array(self.active_hours, dtype=np.intp)
+        active_slots = np.ix_(active_day_indices, hours)
         
         if self.schedule_mode == 'even':
             # Distribute evenly across all active hours
-            for day_offset in days_range:
-                day = self.start_date + timedelta(days=day_offset)
-                if day.weekday() in self.active_days:
-                    for hour in self.active_hours:
-                        hour_key = day.strftime('%Y-%m-%d') + f'-{hour}'
-                        self.hourly_targets[hour_key] = self.target_visits['hourly']
+            self._flat_hourly_target = self.target_visits['hourly']
         
         elif self.schedule_mode == 'random':
-            # Distribute randomly but maintain daily targets
-            for day_offset in days_range:
-                day = self.start_date + timedelta(days=day_offset)
-                if day.weekday() in self.active_days:
-                    daily_target = self.target_visits['daily']
-                    hours_for_day = [
-                        day.strftime('%Y-%m-%d') + f'-{hour}' 
-                        for hour in self.active_hours
-                    ]
-                    
-                    # Distribute the daily target randomly across active hours
-                    hourly_values = [0] * len(hours_for_day)
-                    remaining = daily_target
-                    
-                    while remaining > 0:
-                        idx = random.randint(0, len(hours_for_day) - 1)
-                        hourly_values[idx] += 1
-                        remaining -= 1
-                    
-                    for i, hour_key in enumerate(hours_for_day):
-                        self.hourly_targets[hour_key] = hourly_values[i]
-        
-        elif self.schedule_mode == 'frontloaded':
-            # More visits at the beginning, tapering off
-            total_active_hours = sum(1 for d in days_range if (self.start_date + timedelta(days=d)).weekday() in self.active_days) * len(self.active_hours)
-            total_target = self.target_visits['total']
-            
-            # Create a decreasing weight for each hour
-            weights = []
-            for day_offset in days_range:
-                day = self.start_date + timedelta(days=day_offset)
-                if day.weekday() in self.active_days:
-                    for hour in self.active_hours:
-                        hour_idx = day_offset * 24 + hour
-                        weights.append((day.strftime('%Y-%m-%d') + f'-{hour}', 
-                                       max(1, total_active_hours - hour_idx)))
-            
-            total_weight = sum(w[1] for w in weights)
-            for hour_key, weight in weights:
-                self.hourly_targets[hour_key] = math.ceil((weight / total_weight) * total_target)
-        
-        elif self.schedule_mode == 'backloaded':
-            # Fewer visits at the beginning, ramping up
-            total_active_hours = sum(1 for d in days_range if (self.start_date + timedelta(days=d)).weekday() in self.active_days) * len(self.active_hours)
-            total_target = self.target_visits['total']
-            
-            # Create an increasing weight for each hour
-            weights = []
-            for day_offset in days_range:
-                day = self.start_date + timedelta(days=day_offset)
-                if day.weekday() in self.active_days:
-                    for hour in self.active_hours:
-                        hour_idx = day_offset * 24 + hour
-                        weights.append((day.strftime('%Y-%m-%d') + f'-{hour}', 
-                                       hour_idx + 1))
-            
-            total_weight = sum(w[1] for w in weights)
-            for hour_key, weight in weights:
-                self.hourly_targets[hour_key] = math.ceil((weight / total_weight) * total_target)
+            # Distribute randomly but maintain daily targets: each active
+            # day's visits fall uniformly across its active hours
+            if len(hours):
+                self.hourly_targets_arr[active_slots] = np.random.multinomial(
+                    self.target_visits['daily'],
+                    np.full(len(hours), 1.0 / len(hours)),
+                    size=len(active_day_indices)
+                )
+        
+        elif self.schedule_mode in ('frontloaded', 'backloaded'):
+            # Scale the campaign's weights, which only change with its days
+            # and hours, by the total target
+            weights = _weight_matrix(
+                self.start_date.weekday(), total_days, tuple(self.active_hours), self._active_days_mask, self.schedule_mode
+            )
+            self.hourly_targets_arr[active_slots] = np.ceil(weights * self.target_visits['total'])
         
         activity_logger.info(f"Calculated visit schedule: {self.target_visits}")
     
+    def _ensure_schedule(self) -> None:
+        """Recalculate the schedule if a setting changed since the last calculation."""
+        if not self._dirty:
+            return
+        
+        with self._schedule_lock:
+            if self._dirty:
+                self._dirty = False
+                self.calculate_schedule()
+                self._check_bucket = None
+    
+    def _hourly_target_at(self, now: datetime) -> Optional[int]:
+        """Get the scheduled visit target for the hour containing now.
+        
+        Returns:
+            The hour's target, or None if the schedule doesn't cover that day
+        """
+        if self._start_ordinal is None:
+            return None
+        
+        day_offset = now.toordinal() - self._start_ordinal
+        if not 0 <= day_offset < self._schedule_days:
+            return None
+        
+        if self._flat_hourly_target is not None:
+            # Even schedules target every active hour of every active day
+            if (self._active_hours_mask >> now.hour) & 1 and (self._active_days_mask >> now.weekday()) & 1:
+                return self._flat_hourly_target
+            return 0
+        return int(self.hourly_targets_arr[day_offset, now.hour])
+    
     def should_generate_traffic(self) -> bool:
-        """Check if we should generate traffic right now based on schedule and targets."""
+        """Check if we should generate traffic right now based on schedule and targets.
+        
+        The answer only changes at hour and day boundaries or when the hourly
+        target is reached, so it is reused for the rest of its interval
+        unless the visits since then have reached the hourly target.
+        """
+        self._ensure_schedule()
+        t = int(time.time())
+        bucket = t - t % _TRAFFIC_CHECK_INTERVAL
+        if bucket == self._check_bucket:
+            if not self._check_result:
+                return False
+            if self._check_hourly_target is None or self.hourly_visits < self._check_hourly_target:
+                return True
+        
+        self._check_result = self._check_traffic()
+        self._check_bucket = bucket
+        return self._check_result
+    
+    def _check_traffic(self) -> bool:
+        """Evaluate the schedule and targets for the current time."""
         now = datetime.now()
+        self._check_hourly_target = None
         current_hour = now.hour
         current_day = now.weekday()
-        current_hour_key = now.strftime('%Y-%m-%d') + f'-{current_hour}'
         
         # Check if we're within the campaign date range
         if self.start_date and now < self.start_date:
@@ -237,11 +335,12 @@ class TrafficScheduler:
             return False
         
         # Check if current hour and day are in the active ranges
-        if current_hour not in self.active_hours or current_day not in self.active_days:
+        if not (self._active_hours_mask >> current_hour) & 1 or not (self._active_days_mask >> current_day) & 1:
             return False
         
         # Check if we've reached the hourly target
-        if current_hour_key in self.hourly_targets and self.hourly_visits >= self.hourly_targets[current_hour_key]:
+        hourly_target = self._check_hourly_target = self._hourly_target_at(now)
+        if hourly_target is not None and self.hourly_visits >= hourly_target:
             return False
         
         # Reset counters if the hour/day/month has changed
@@ -266,42 +365,39 @@ class TrafficScheduler:
         self.monthly_visits += 1
         self.total_visits += 1
     
-    def get_stats(self) -> dict:
-        """Get current statistics about the traffic schedule."""
-        now = datetime.now()
-        current_hour_key = now.strftime('%Y-%m-%d') + f'-{now.hour}'
-        
-        stats = {
-            'targets': self.target_visits.copy(),
-            'current': {
-                'hourly': self.hourly_visits,
-                'daily': self.daily_visits,
-                'monthly': self.monthly_visits,
-                'total': self.total_visits
-            },
-            'progress': {
-                'hourly': 0,
-                'daily': 0,
-                'monthly': 0,
-                'total': 0
-            },
-            'hourly_target': self.hourly_targets.get(current_hour_key, 0),
-            'schedule_mode': self.schedule_mode,
-            'active_hours': self.active_hours,
-            'active_days': self.active_days
-        }
-        
-        # Calculate progress percentages
-        if self.target_visits['hourly'] > 0:
-            stats['progress']['hourly'] = min(100, round(self.hourly_visits / self.target_visits['hourly'] * 100))
+    def get_stats(self, copy: bool = False) -> dict:
+        """Get current statistics about the traffic schedule.
         
-        if self.target_visits['daily'] > 0:
-            stats['progress']['daily'] = min(100, round(self.daily_visits / self.target_visits['daily'] * 100))
+        The stats dict is allocated once and refreshed in place on every call,
+        so callers that keep the result past the call should ask for a copy.
         
-        if self.target_visits['monthly'] > 0:
-            stats['progress']['monthly'] = min(100, round(self.monthly_visits / self.target_visits['monthly'] * 100))
+        Args:
+            copy: Return an independent copy instead of the shared dict
+        """
+        self._ensure_schedule()
         
-        if self.target_visits['total'] > 0:
-            stats['progress']['total'] = min(100, round(self.total_visits / self.target_visits['total'] * 100))
-        
-        return stats
\ No newline at end of file
+        # Several threads may refresh the buffer at once
+        with self._stats_lock:
+            stats = self._stats_buf
+            stats['targets'].update(self.target_visits)
+            
+            current = stats['current']
+            current['hourly'] = self.hourly_visits
+            current['daily'] = self.daily_visits
+            current['monthly'] = self.monthly_visits
+            current['total'] = self.total_visits
+            
+            # Calculate progress percentages
+            progress = stats['progress']
+            for period in progress:
+                target = self.target_visits[period]
+                progress[period] = min(100, round(current[period] / target * 100)) if target > 0 else 0
+            
+            stats['hourly_target'] = self._hourly_target_at(datetime.now()) or 0
+            stats['schedule_mode'] = self.schedule_mode
+            stats['active_hours'] = self.active_hours
+            stats['active_days'] = self.active_days
+            
+            if copy:
+                return {key: dict(value) if isinstance(value, dict) else value for key, value in stats.items()}
+            return stats
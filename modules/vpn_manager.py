@@ -1,19 +1,56 @@
+import os
 import re
+import json
 import time
 import random
 import subprocess
 import logging
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 import requests
-from typing import List, Dict, Optional, Tuple
+from typing import ClassVar, List, Dict, Optional, Tuple
 
 # Get loggers
 activity_logger = logging.getLogger("activity")
 error_logger = logging.getLogger("error")
 
+# Seconds a provider's region list is reused before asking its CLI again
+_REGION_TTL = 3600
+
+# Country names in `nordvpn countries` output
+_NORD_COUNTRY_RE = re.compile(r'- ([A-Za-z_\s]+)')
+
+# Location code and name pairs in `expressvpn list all` output
+_EXPRESS_LOCATION_RE = re.compile(r'([A-Z]{2})\s+-\s+([A-Za-z\s]+)')
+
+# Seconds to wait for a provider's CLI to list its regions
+_REGION_CLI_TIMEOUT = 30
+
+# Seconds the current public IP is reused before it is looked up again
+_IP_CACHE_TTL = 60
+
+# Region lists persisted between runs, keyed by provider
+_REGION_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'trafficbot', 'regions.json')
+
+@functools.lru_cache(maxsize=8)
+def _country_proxy_re(countries: Tuple[str, ...]) -> re.Pattern:
+    """Compile a pattern matching proxies tagged with any of the countries.
+    
+    A proxy matches if it contains "country:<code>" or starts with "<code>:",
+    ignoring case.
+    """
+    alternation = '|'.join(re.escape(country) for country in countries)
+    return re.compile(rf'country:(?:{alternation})|^(?:{alternation}):', re.IGNORECASE)
+
 class VPNManager:
     """Class for managing VPN connections and proxies."""
     
+    # Supported VPN providers
+    VPN_PROVIDER_NAMES: ClassVar[frozenset] = frozenset(('pia', 'nordvpn', 'expressvpn'))
+    
     def __init__(self):
         """Initialize the VPN manager."""
         # VPN providers configuration
@@ -44,30 +81,92 @@ class VPNManager:
         # Proxy settings
         self.proxies = []
         self.current_proxy = None
+        
+        # Proxies left in the current shuffled round; each proxy is handed
+        # out once per round so the same one isn't picked back to back
+        self._proxy_cycle = deque()
+        self._proxy_lock = threading.Lock()
         self.current_vpn = None
         self.use_proxies = True
         
         # Country targeting
         self.target_countries = []  # e.g., ['US', 'UK', 'CA', 'AU']
+        
+        # Last public IP as (fetched_at, ip), and a session that keeps the
+        # lookup's TLS connection open between calls
+        self._ip_cache: Tuple[float, Optional[str]] = (0.0, None)
+        self._ip_session = requests.Session()
+        
+        # Providers that are enabled and have regions (replaced, never mutated)
+        self._ready_providers: Tuple[str, ...] = ()
+        
+        # Unfiltered region lists by provider as (fetched_at, regions)
+        self._region_cache: Dict[str, Tuple[float, List[str]]] = self._read_region_cache()
+        self._region_cache_lock = threading.Lock()
+    
+    def _update_ready_providers(self) -> None:
+        """Rebuild the providers get_random_vpn picks from after a change."""
+        self._ready_providers = tuple(
+            p for p, vpn_info in self.vpn_providers.items()
+            if vpn_info['enabled'] and vpn_info['regions']
+        )
+    
+    def has_ready_vpn(self) -> bool:
+        """Check if any enabled VPN provider has regions loaded."""
+        return bool(self._ready_providers)
+    
+    @staticmethod
+    def _read_region_cache() -> Dict[str, Tuple[float, List[str]]]:
+        """Read region lists saved by a previous run, if any."""
+        try:
+            with open(_REGION_CACHE_PATH, 'r') as f:
+                data = json.load(f)
+            return {provider: (float(fetched_at), list(regions)) for provider, (fetched_at, regions) in data.items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            error_logger.error(f"Failed to read VPN region cache: {str(e)}")
+            return {}
+    
+    def _store_regions(self, provider: str, regions: List[str]) -> None:
+        """Cache a provider's unfiltered region list and persist the cache."""
+        with self._region_cache_lock:
+            self._region_cache[provider] = (time.time(), regions)
+            try:
+                os.makedirs(os.path.dirname(_REGION_CACHE_PATH), exist_ok=True)
+                tmp_path = f"{_REGION_CACHE_PATH}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._region_cache, f)
+                os.replace(tmp_path, _REGION_CACHE_PATH)
+            except Exception as e:
+                error_logger.error(f"Failed to write VPN region cache: {str(e)}")
     
-    def load_proxies(self, proxy_file: str) -> None:
-        """Load proxies from a file."""
+    def load_proxies(self, proxy_file: str) -> bool:
+        """Load proxies from a file.
+        
+        Returns:
+            True if the file was loaded, False if reading it failed
+        """
         try:
+            # If target countries are specified, collect the proxies that match
+            # those countries in the same pass that reads the file
+            country_re = _country_proxy_re(tuple(self.target_countries)) if self.target_countries else None
+            all_proxies = []
+            filtered_proxies = []
+            has_country_info = False
             with open(proxy_file, 'r') as f:
-                all_proxies = [line.strip() for line in f if line.strip()]
-            
-            # If target countries are specified, filter proxies that match those countries
-            if self.target_countries and any('country:' in p.lower() for p in all_proxies):
-                filtered_proxies = []
-                for proxy in all_proxies:
-                    # Check if the proxy has country information
-                    proxy_lower = proxy.lower()
-                    for country in self.target_countries:
-                        country_lower = country.lower()
-                        if f"country:{country_lower}" in proxy_lower or proxy_lower.startswith(f"{country_lower}:"):
+                for proxy in (line.strip() for line in f):
+                    if not proxy:
+                        continue
+                    all_proxies.append(proxy)
+                    if country_re is not None:
+                        if country_re.search(proxy):
                             filtered_proxies.append(proxy)
-                            break
-                
+                        if not has_country_info and 'country:' in proxy.lower():
+                            has_country_info = True
+            
+            # Only filter if the file carries country information at all
+            if has_country_info:
                 if filtered_proxies:
                     self.proxies = filtered_proxies
                     activity_logger.info(f"Filtered proxies from {len(all_proxies)} to {len(filtered_proxies)} based on target countries")
@@ -77,9 +176,13 @@ class VPNManager:
             else:
                 self.proxies = all_proxies
             
+            # Start a new round over the loaded proxies
+            self._proxy_cycle = deque()
             activity_logger.info(f"Loaded {len(self.proxies)} proxies from {proxy_file}")
+            return True
         except Exception as e:
             error_logger.error(f"Failed to load proxies: {str(e)}")
+            return False
     
     def filter_regions_by_country(self, provider: str, regions: List[str]) -> List[str]:
         """Filter VPN regions to only include target countries."""
@@ -113,34 +216,48 @@ class VPNManager:
         try:
             vpn_info = self.vpn_providers[provider]
             
+            # Reuse a recent region list instead of running the CLI again
+            fetched_at, cached_regions = self._region_cache.get(provider, (0.0, None))
+            if cached_regions and time.time() - fetched_at < _REGION_TTL:
+                vpn_info['regions'] = self.filter_regions_by_country(provider, cached_regions)
+                self._update_ready_providers()
+                activity_logger.info(f"Loaded {len(vpn_info['regions'])} cached {provider} regions")
+                return
+            
             if provider == 'pia':
                 # PIA VPN
-                result = subprocess.run(["piactl", "get", "regions"], capture_output=True, text=True)
+                result = subprocess.run(["piactl", "get", "regions"], capture_output=True, text=True, timeout=_REGION_CLI_TIMEOUT)
                 if result.returncode == 0:
                     all_regions = [region.strip() for region in result.stdout.split('\n') if region.strip()]
+                    self._store_regions(provider, all_regions)
                     vpn_info['regions'] = self.filter_regions_by_country(provider, all_regions)
+                    self._update_ready_providers()
                     activity_logger.info(f"Loaded {len(vpn_info['regions'])} PIA regions")
                 else:
                     error_logger.error(f"Failed to get PIA regions: {result.stderr}")
             
             elif provider == 'nordvpn':
                 # NordVPN (using their CLI tool)
-                result = subprocess.run(["nordvpn", "countries"], capture_output=True, text=True)
+                result = subprocess.run(["nordvpn", "countries"], capture_output=True, text=True, timeout=_REGION_CLI_TIMEOUT)
                 if result.returncode == 0:
-                    all_countries = re.findall(r'- ([A-Za-z_\s]+)', result.stdout)
+                    all_countries = _NORD_COUNTRY_RE.findall(result.stdout)
                     all_regions = [c.strip() for c in all_countries if c.strip()]
+                    self._store_regions(provider, all_regions)
                     vpn_info['regions'] = self.filter_regions_by_country(provider, all_regions)
+                    self._update_ready_providers()
                     activity_logger.info(f"Loaded {len(vpn_info['regions'])} NordVPN countries")
                 else:
                     error_logger.error(f"Failed to get NordVPN countries: {result.stderr}")
             
             elif provider == 'expressvpn':
                 # ExpressVPN
-                result = subprocess.run(["expressvpn", "list", "all"], capture_output=True, text=True)
+                result = subprocess.run(["expressvpn", "list", "all"], capture_output=True, text=True, timeout=_REGION_CLI_TIMEOUT)
                 if result.returncode == 0:
-                    locations = re.findall(r'([A-Z]{2})\s+-\s+([A-Za-z\s]+)', result.stdout)
+                    locations = _EXPRESS_LOCATION_RE.findall(result.stdout)
                     all_regions = [f"{code} - {name.strip()}" for code, name in locations]
+                    self._store_regions(provider, all_regions)
                     vpn_info['regions'] = self.filter_regions_by_country(provider, all_regions)
+                    self._update_ready_providers()
                     activity_logger.info(f"Loaded {len(vpn_info['regions'])} ExpressVPN locations")
                 else:
                     error_logger.error(f"Failed to get ExpressVPN locations: {result.stderr}")
@@ -148,10 +265,27 @@ class VPNManager:
         except Exception as e:
             error_logger.error(f"Failed to load {provider} regions: {str(e)}")
     
+    def load_all_regions(self, enabled_only: bool = False) -> None:
+        """Load VPN regions for several providers at once.
+        
+        Each provider's CLI runs on its own thread, so the wait is that of
+        the slowest provider rather than the sum of all three.
+        
+        Args:
+            enabled_only: Only load regions for enabled providers
+        """
+        providers = [p for p, vpn_info in self.vpn_providers.items() if vpn_info['enabled'] or not enabled_only]
+        if not providers:
+            return
+        
+        with ThreadPoolExecutor(max_workers=len(providers)) as executor:
+            list(executor.map(self.load_vpn_regions, providers))
+    
     def enable_vpn(self, provider: str) -> bool:
         """Enable a specific VPN provider."""
         if provider in self.vpn_providers:
             self.vpn_providers[provider]['enabled'] = True
+            self._update_ready_providers()
             activity_logger.info(f"Enabled {provider} VPN provider")
             return True
         return False
@@ -160,6 +294,7 @@ class VPNManager:
         """Disable a specific VPN provider."""
         if provider in self.vpn_providers:
             self.vpn_providers[provider]['enabled'] = False
+            self._update_ready_providers()
             activity_logger.info(f"Disabled {provider} VPN provider")
             return True
         return False
@@ -175,9 +310,11 @@ class VPNManager:
         try:
             activity_logger.info(f"Connecting to {provider} region: {region}")
             
-            # Disconnect any active VPNs first
-            self.disconnect_all_vpns()
-            time.sleep(2)
+            # Disconnect any active VPNs first, giving the network time to
+            # settle only if something was actually connected
+            if self.is_any_vpn_connected():
+                self.disconnect_all_vpns()
+                time.sleep(2)
             
             if provider == 'pia':
                 # PIA VPN
@@ -196,6 +333,7 @@ class VPNManager:
                 vpn_info['current_region'] = region
                 vpn_info['connected'] = True
                 self.current_vpn = provider
+                self._invalidate_ip()
                 activity_logger.info(f"Connected to {provider} region: {region}")
                 return True
             else:
@@ -230,6 +368,7 @@ class VPNManager:
             
             if self.current_vpn == provider:
                 self.current_vpn = None
+            self._invalidate_ip()
             
             activity_logger.info(f"Disconnected from {provider} VPN")
             return True
@@ -250,12 +389,15 @@ class VPNManager:
         return success
     
     def get_random_proxy(self) -> Optional[str]:
-        """Get a random proxy from the loaded list."""
+        """Get the next proxy from a shuffled round over the loaded list."""
         if not self.proxies:
             error_logger.error("No proxies available")
             return None
         
-        self.current_proxy = random.choice(self.proxies)
+        with self._proxy_lock:
+            if not self._proxy_cycle:
+                self._proxy_cycle = deque(random.sample(self.proxies, len(self.proxies)))
+            self.current_proxy = self._proxy_cycle.popleft()
         activity_logger.info(f"Selected proxy: {self.current_proxy}")
         return self.current_proxy
     
@@ -277,22 +419,42 @@ class VPNManager:
     
     def get_random_vpn(self) -> Tuple[Optional[str], Optional[str]]:
         """Get a random VPN provider and region from enabled providers."""
-        enabled_providers = [p for p in self.vpn_providers if self.vpn_providers[p]['enabled'] and self.vpn_providers[p]['regions']]
+        ready_providers = self._ready_providers
         
-        if not enabled_providers:
+        if not ready_providers:
             error_logger.error("No enabled VPN providers with regions available")
             return None, None
         
-        provider = random.choice(enabled_providers)
+        provider = random.choice(ready_providers)
         region = self.get_random_vpn_region(provider)
         
         return provider, region
     
-    def get_current_ip(self) -> str:
-        """Get the current public IP address."""
+    def _invalidate_ip(self) -> None:
+        """Forget the cached IP and pooled connections after a VPN change.
+        
+        A lookup in another thread may still be using the old session, so
+        a new one is swapped in and the old one is left to close once it
+        is no longer referenced.
+        """
+        self._ip_cache = (0.0, None)
+        self._ip_session = requests.Session()
+    
+    def get_current_ip(self, use_cache: bool = True) -> str:
+        """Get the current public IP address.
+        
+        Args:
+            use_cache: Return the IP looked up within the last minute, if any
+        """
+        if use_cache:
+            fetched_at, ip = self._ip_cache
+            if ip is not None and time.monotonic() - fetched_at < _IP_CACHE_TTL:
+                return ip
+        
         try:
-            response = requests.get("https://api.ipify.org", timeout=10)
+            response = self._ip_session.get("https://api.ipify.org", timeout=10)
             ip = response.text
+            self._ip_cache = (time.monotonic(), ip)
             activity_logger.info(f"Current IP: {ip}")
             return ip
         except Exception as e: